@@ -0,0 +1,121 @@
+"""Requests/sec through the auth middleware stack, driven in-process at the ASGI level.
+
+Run with `make bench-auth` or `python -m benchmarks.auth --requests 20000`.
+No server or socket is involved, so the numbers are the middleware overhead alone: `/mcp` is a
+streamed response of a few chunks (like an SSE reply), `/documents` a small page behind the cookie.
+The `BaseHTTPMiddleware` row wraps the app in a pass-through of the kind the middlewares used to be,
+for comparison.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import HTMLResponse, StreamingResponse
+from starlette.routing import Route
+
+TOKEN = "bench-token"
+
+
+def create_app() -> Starlette:
+    async def mcp(request):
+        async def events():
+            for i in range(5):
+                yield f"event: message\ndata: {i}\n\n".encode()
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def document(request):
+        return HTMLResponse("<html><body>report</body></html>")
+
+    return Starlette(routes=[Route("/mcp", mcp, methods=["GET", "POST"]), Route("/documents/report.html", document)])
+
+
+class PassThroughMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def build_stacks() -> dict:
+    # Secrets are read when the middlewares are built
+    os.environ["MCP_BEARER_TOKEN"] = TOKEN
+    os.environ.setdefault("DOCUMENTS_TOKEN", "bench-cookie")
+    os.environ.setdefault("DOCUMENTS_USERNAME", "bench")
+    os.environ.setdefault("DOCUMENTS_PASSWORD", "bench")
+    from src.utils.auth import BearerAuthMiddleware, LoginPasswordMiddleware
+
+    bare = create_app()
+    auth = create_app()
+    auth.add_middleware(BearerAuthMiddleware, protected_paths=["/mcp"])
+    auth.add_middleware(LoginPasswordMiddleware, protected_paths=["/documents"])
+    base = create_app()
+    base.add_middleware(PassThroughMiddleware)
+    base.add_middleware(PassThroughMiddleware)
+    return {"no middleware": bare, "auth stack": auth, "BaseHTTPMiddleware x2": base}
+
+
+def scope(path: str) -> dict:
+    headers = [
+        (b"authorization", f"Bearer {TOKEN}".encode()),
+        (b"cookie", f"auth_token={os.environ['DOCUMENTS_TOKEN']}".encode()),
+    ]
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": headers,
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+    }
+
+
+async def drive(app, path: str, requests: int, concurrency: int) -> float:
+    """Send `requests` requests with `concurrency` in flight, return requests/sec."""
+    async def one():
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Like a real server: nothing more until the client goes away
+            await asyncio.Event().wait()
+
+        status = None
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await app(scope(path), receive, send)
+        assert status == 200, f"{path} answered {status}"
+
+    async def worker(count: int):
+        for _ in range(count):
+            await one()
+
+    # Warm up routing and the middleware stack build
+    await worker(100)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+    return (requests // concurrency * concurrency) / (time.perf_counter() - start)
+
+
+async def run(requests: int, concurrency: int) -> None:
+    print(f"{'stack':<24}{'/mcp req/s':>14}{'/documents req/s':>20}")
+    for name, app in build_stacks().items():
+        mcp = await drive(app, "/mcp", requests, concurrency)
+        documents = await drive(app, "/documents/report.html", requests, concurrency)
+        print(f"{name:<24}{mcp:>14.0f}{documents:>20.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10000, help="Requests per stack and path (default: 10000).")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight (default: 10).")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Wall time of `_get_candidates_details` as the batch grows, serial vs. bounded concurrent fan-out.
+
+Run with `make bench-fanout` or `python -m benchmarks.fanout --latency 0.05 --limit 8`.
+Every stand-in response is delayed by `--latency`, standing in for the Recruitee round trip.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.standin import create_app, serve_in_thread
+
+
+
+async def run(batch_sizes: list[int], limit: int) -> list[tuple[int, float, float]]:
+    from src.tools import utils
+
+    async def fetch(candidate_id: int) -> dict:
+        return await utils._get(f"/candidates/{candidate_id}")
+
+    rows = []
+    await utils.open_http_client()
+    try:
+        for size in batch_sizes:
+            ids = list(range(1, size + 1))
+            start = time.perf_counter()
+            await utils.gather_limited(ids, fetch, limit=1)
+            serial = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await utils.gather_limited(ids, fetch, limit=limit)
+            rows.append((size, serial, time.perf_counter() - start))
+    finally:
+        await utils.close_http_client()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in latency per request in seconds (default: 0.05).")
+    parser.add_argument("--limit", type=int, default=8, help="Concurrency cap for the fan-out (default: 8).")
+    parser.add_argument("--sizes", default="1,10,25,50,100", help="Comma-separated batch sizes (default: 1,10,25,50,100).")
+    args = parser.parse_args()
+
+    with serve_in_thread(create_app(latency=args.latency)) as url:
+        os.environ["RECRUITEE_API_URL"] = url
+        os.environ.setdefault("RECRUITEE_COMPANY_ID", "bench")
+        os.environ.setdefault("RECRUITEE_API_TOKEN", "bench")
+        # The client-side rate limit would otherwise cap both runs at the same request rate
+        os.environ.setdefault("RECRUITEE_RATE_LIMIT", "1000000")
+        os.environ.setdefault("RECRUITEE_RATE_BURST", "1000000")
+        rows = asyncio.run(run([int(s) for s in args.sizes.split(",")], args.limit))
+
+    print(f"{'batch':>6}{'serial s':>12}{f'limit={args.limit} s':>14}{'speedup':>10}")
+    for size, serial, concurrent in rows:
+        print(f"{size:>6}{serial:>12.3f}{concurrent:>14.3f}{serial / concurrent:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Per-call latency of `_get` with a fresh client per request vs. the pooled process-wide client.
+
+Run with `make bench-http_client` or `python -m benchmarks.http_client --requests 500`.
+The stand-in speaks plain HTTP on localhost, so only the TCP handshake is saved here;
+against api.recruitee.com the TLS handshake makes the difference considerably larger.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.standin import create_app, serve_in_thread
+
+
+
+async def measure(requests: int) -> list[float]:
+    from src.tools.utils import _get
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await _get("/offers")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def run(requests: int) -> dict[str, list[float]]:
+    from src.tools import utils
+
+    results = {"per-call client": await measure(requests)}
+    await utils.open_http_client()
+    try:
+        results["pooled client"] = await measure(requests)
+    finally:
+        await utils.close_http_client()
+    return results
+
+
+def report(results: dict[str, list[float]]) -> None:
+    print(f"{'mode':<18}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode, timings in results.items():
+        timings = sorted(timings)
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        print(f"{mode:<18}{statistics.mean(timings) * 1000:>10.2f}{statistics.median(timings) * 1000:>10.2f}{p99 * 1000:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="Sequential requests per mode (default: 300).")
+    args = parser.parse_args()
+
+    with serve_in_thread(create_app()) as url:
+        # Must be set before `src` is imported, server_config reads it at import time
+        os.environ["RECRUITEE_API_URL"] = url
+        os.environ.setdefault("RECRUITEE_COMPANY_ID", "bench")
+        os.environ.setdefault("RECRUITEE_API_TOKEN", "bench")
+        # Lift the client-side rate limit, or both modes only measure its 10 req/s
+        os.environ.setdefault("RECRUITEE_RATE_LIMIT", "1000000")
+        os.environ.setdefault("RECRUITEE_RATE_BURST", "1000000")
+        report(asyncio.run(run(args.requests)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Concurrent MCP sessions against the streamable-http server, through the bearer auth, backed by the synthetic stand-in.
+
+Run with `make bench-load` or `python -m benchmarks.load --sessions 50 --duration 120`.
+Starts the stand-in and `python -m src.app --transport streamable-http` in their own processes, then
+ramps up `--sessions` MCP client sessions. Each one repeats an agent-like workflow with `--think`
+seconds between calls: resolve an offer name, search its candidates, fetch their details, then a batch
+of metrics for the offer. Every `--interval` seconds it prints the throughput and latency of the calls
+that finished in the interval, and the server's event loop lag and resident memory from its /metrics.
+The client sessions share one process: if "client lag" grows, the numbers are limited by the load
+generator rather than the server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.standin import Dataset, STAGES, free_port, serve_in_process
+
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOKEN = "bench-token"
+_LAG = "recruitee_mcp_event_loop_lag_seconds"
+_RSS = "process_resident_memory_bytes"
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile, 0 without values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))]
+
+
+def parse_metrics(text: str) -> dict[str, float]:
+    """Prometheus text exposition as {'name{labels}': value}."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def lag_summary(before: dict[str, float], after: dict[str, float]) -> tuple[float, float]:
+    """Mean event loop lag between two scrapes, and the histogram bucket holding its 99th percentile, in seconds."""
+    count = after.get(f"{_LAG}_count", 0) - before.get(f"{_LAG}_count", 0)
+    if count <= 0:
+        return 0.0, 0.0
+    mean = (after.get(f"{_LAG}_sum", 0) - before.get(f"{_LAG}_sum", 0)) / count
+    buckets = sorted(
+        (float(name.split('le="')[1].rstrip('"}')), after[name] - before.get(name, 0))
+        for name in after if name.startswith(f"{_LAG}_bucket") and "+Inf" not in name
+    )
+    p99 = next((bound for bound, cumulative in buckets if cumulative >= 0.99 * count), float("inf"))
+    return mean, p99
+
+
+class Load:
+    """Calls made by all sessions, as (finished at, tool, seconds, error or None)."""
+
+    def __init__(self, data: Dataset, think: float, deadline: float):
+        self.data = data
+        self.think = think
+        self.deadline = deadline
+        self.calls: list[tuple[float, str, float, str | None]] = []
+        self.active = 0
+
+    async def call(self, client, tool: str, arguments: dict):
+        from fastmcp.exceptions import ToolError
+
+        started = time.perf_counter()
+        error = None
+        result = None
+        try:
+            result = await client.call_tool(tool, arguments)
+        except ToolError as e:
+            error = f"tool error: {str(e)[:120]}"
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)[:120]}"
+        finished = time.perf_counter()
+        self.calls.append((finished, tool, finished - started, error))
+        if self.think:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.think)
+        return result
+
+    async def workflow(self, client, rng: random.Random) -> None:
+        offer = rng.choice(self.data.offers)
+        await self.call(client, "resolve_entities", {"names": [offer["title"], rng.choice(STAGES)[0]]})
+        found = await self.call(client, "search_candidates", {"search_filter": {"offer_ids": [offer["id"]], "limit": 20}})
+        candidate_ids = [c["id"] for c in json.loads(found[0].text)] if found else []
+        if candidate_ids:
+            await self.call(client, "get_candidates_details", {"candidate_ids": candidate_ids[:10], "fields": ["id", "name", "placements", "tags"]})
+        await self.call(client, "get_metrics_batch", {"queries": [
+            {"id": "applications", "kind": "single", "mqp": {"metric": "applications", "filters": f"job:{offer['id']}"}},
+            {"id": "hires", "kind": "trend", "mqp": {"metric": "hires_over_time", "filters": f"job:{offer['id']}"}},
+            {"id": "funnel", "kind": "funnel", "mqp": {"metric": "dropoff_rate", "filters": f"job:{offer['id']}"}},
+        ]})
+
+    async def session(self, url: str, number: int) -> None:
+        from fastmcp import Client
+        from fastmcp.client.transports import StreamableHttpTransport
+
+        rng = random.Random(number)
+        transport = StreamableHttpTransport(url, headers={"Authorization": f"Bearer {TOKEN}"})
+        try:
+            async with Client(transport, timeout=120) as client:
+                self.active += 1
+                try:
+                    while time.perf_counter() < self.deadline:
+                        await self.workflow(client, rng)
+                finally:
+                    self.active -= 1
+        except Exception as e:
+            self.calls.append((time.perf_counter(), "(session)", 0.0, f"{type(e).__name__}: {str(e)[:120]}"))
+
+
+async def client_lag(samples: list[float], interval: float = 0.25) -> None:
+    """Event loop lag of the load generator itself."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def run(url: str, args: argparse.Namespace) -> None:
+    data = Dataset(args.offers, 0, args.seed)
+    started = time.perf_counter()
+    load = Load(data, args.think, started + args.ramp + args.duration)
+    metrics = httpx.AsyncClient(base_url=url.rsplit("/mcp", 1)[0], headers={"Authorization": f"Bearer {TOKEN}"})
+    scrapes = [parse_metrics((await metrics.get("/metrics")).text)]
+    lags: list[float] = []
+    monitor = asyncio.create_task(client_lag(lags))
+
+    async def ramp_up() -> list[asyncio.Task]:
+        tasks = []
+        for i in range(args.sessions):
+            tasks.append(asyncio.create_task(load.session(url, args.seed + i)))
+            await asyncio.sleep(args.ramp / args.sessions)
+        return tasks
+
+    ramp = asyncio.create_task(ramp_up())
+    print(f"{'time s':>7}{'sessions':>10}{'calls/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'lag ms':>8}{'lag p99':>9}{'RSS MB':>8}{'client lag':>12}")
+    seen = 0
+    last = started
+    while time.perf_counter() < load.deadline:
+        await asyncio.sleep(min(args.interval, max(0.0, load.deadline - time.perf_counter())))
+        elapsed, last = time.perf_counter() - last, time.perf_counter()
+        scrapes.append(parse_metrics((await metrics.get("/metrics")).text))
+        window = load.calls[seen:]
+        seen += len(window)
+        latencies = [seconds for _, _, seconds, error in window if error is None]
+        mean_lag, p99_lag = lag_summary(scrapes[-2], scrapes[-1])
+        interval_lags, lags[:] = lags[:], []
+        print(
+            f"{time.perf_counter() - started:>7.0f}{load.active:>10}{len(window) / elapsed:>9.1f}"
+            f"{percentile(latencies, 50) * 1000:>9.0f}{percentile(latencies, 99) * 1000:>9.0f}"
+            f"{sum(1 for *_, error in window if error):>8}{mean_lag * 1000:>8.1f}{'<' + format(p99_lag * 1000, '.0f'):>9}"
+            f"{scrapes[-1].get(_RSS, 0) / 2 ** 20:>8.0f}{max(interval_lags, default=0) * 1000:>10.0f}ms"
+        )
+
+    await asyncio.gather(*await ramp)
+    monitor.cancel()
+    scrapes.append(parse_metrics((await metrics.get("/metrics")).text))
+    await metrics.aclose()
+    report(load, scrapes, time.perf_counter() - started)
+
+
+def report(load: Load, scrapes: list[dict[str, float]], elapsed: float) -> None:
+    print(f"\n{'tool':<26}{'calls':>7}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for tool in sorted({tool for _, tool, _, _ in load.calls}):
+        calls = [(seconds, error) for _, name, seconds, error in load.calls if name == tool]
+        latencies = [seconds for seconds, error in calls if error is None]
+        print(
+            f"{tool:<26}{len(calls):>7}{sum(1 for _, error in calls if error):>8}"
+            f"{percentile(latencies, 50) * 1000:>9.0f}{percentile(latencies, 99) * 1000:>9.0f}{max(latencies, default=0) * 1000:>9.0f}"
+        )
+
+    errors = [error for *_, error in load.calls if error]
+    mean_lag, p99_lag = lag_summary(scrapes[0], scrapes[-1])
+    rss = [s[_RSS] for s in scrapes if _RSS in s]
+    print(f"\n{len(load.calls)} calls in {elapsed:.0f} s, {len(load.calls) / elapsed:.1f} calls/s, {len(errors)} errors")
+    print(f"server event loop lag: mean {mean_lag * 1000:.1f} ms, p99 under {p99_lag * 1000:.0f} ms")
+    if rss:
+        print(f"server memory: {rss[0] / 2 ** 20:.0f} MB before the load, {max(rss) / 2 ** 20:.0f} MB peak, {rss[-1] / 2 ** 20:.0f} MB at the end")
+    for error in sorted(set(errors))[:5]:
+        print(f"error: {error}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent MCP client sessions (default: 20).")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of full load after the ramp-up (default: 60).")
+    parser.add_argument("--ramp", type=float, default=5, help="Seconds over which the sessions start (default: 5).")
+    parser.add_argument("--think", type=float, default=0.2, help="Mean pause between the calls of a session in seconds (default: 0.2).")
+    parser.add_argument("--interval", type=float, default=5, help="Seconds between report lines (default: 5).")
+    parser.add_argument("--candidates", type=int, default=100_000, help="Synthetic candidates (default: 100000).")
+    parser.add_argument("--offers", type=int, default=2000, help="Synthetic offers (default: 2000).")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in latency per request in seconds (default: 0.05).")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Random extra latency per request, up to this many seconds (default: 0.05).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stand-in requests answered with a 429 (default: 0).")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Recruitee requests per second allowed by the server (default: unlimited).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the dataset and of the sessions (default: 0).")
+    args = parser.parse_args()
+
+    with serve_in_process(
+        latency=args.latency, offers=args.offers, candidates=args.candidates,
+        jitter=args.jitter, error_rate=args.error_rate, retry_after=0.1, seed=args.seed,
+    ) as standin_url, tempfile.TemporaryDirectory() as documents, tempfile.TemporaryFile("w+") as log:
+        port = free_port()
+        env = {
+            **os.environ,
+            "RECRUITEE_API_URL": standin_url,
+            "RECRUITEE_COMPANY_ID": "bench",
+            "RECRUITEE_API_TOKEN": "bench",
+            "RECRUITEE_RATE_LIMIT": str(args.rate_limit or 1_000_000),
+            "RECRUITEE_RATE_BURST": str(int(args.rate_limit or 1_000_000)),
+            "MCP_BEARER_TOKEN": TOKEN,
+            "DOCUMENTS_DIR": documents,
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "src.app", "--transport", "streamable-http", "--host", "127.0.0.1", "--port", str(port)],
+            stdout=subprocess.DEVNULL, stderr=log, cwd=_PROJECT_DIR, env=env,
+        )
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    httpx.get(f"http://127.0.0.1:{port}/metrics", headers={"Authorization": f"Bearer {TOKEN}"}).raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    if server.poll() is not None or time.monotonic() > deadline:
+                        log.seek(0)
+                        raise SystemExit(f"Server didn't start:\n{log.read()[-2000:]}")
+                    time.sleep(0.1)
+            asyncio.run(run(f"http://127.0.0.1:{port}/mcp", args))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
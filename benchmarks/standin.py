@@ -0,0 +1,463 @@
+"""Local stand-in for the Recruitee API, used by the benchmarks in this package.
+
+Serves a synthetic company on plain HTTP: every endpoint the tools in src/tools call (candidate search
+and details, notes, offers with their pipeline templates, talent pools, tags, disqualify reasons,
+custom fields and the report/* metrics), with an injectable per-request latency and 429 responses,
+so benchmarks measure our own overhead rather than the network to api.recruitee.com.
+
+The dataset is deterministic for a given size and seed. Candidate details and notes are generated
+on request, only the search index is held in memory, so 100k candidates start in a few seconds.
+"""
+import asyncio
+import json
+import multiprocessing
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+
+# Every candidate and offer is created in the year before this instant, so timings don't depend on today
+EPOCH = 1_700_000_000
+_YEAR = 365 * 24 * 3600
+
+FIRST_NAMES = ["Anna", "Piotr", "Maria", "Jan", "Olga", "Tomasz", "Ewa", "Marek", "Zofia", "Adam", "Julia", "Paweł", "Léa", "Noah", "Mia", "Lucas"]
+LAST_NAMES = ["Nowak", "Kowalski", "Wiśniewska", "Wójcik", "Smith", "Müller", "Dubois", "García", "Rossi", "Jansen", "Novák", "Kim"]
+TITLES = ["Backend Engineer", "Frontend Developer", "Data Analyst", "Product Manager", "Recruiter", "Sales Manager", "DevOps Engineer", "Designer", "Accountant", "Support Specialist"]
+CITIES = ["Warsaw", "Kraków", "Berlin", "Remote", "Gdańsk", "Wrocław", "Amsterdam"]
+SOURCES = ["LinkedIn", "Career site", "Referral", "Indeed", "Pracuj.pl", "Agency", "Sourced"]
+# (name, category, group) of every stage of every pipeline template
+STAGES = [
+    ("Applied", "apply", "applied"),
+    ("Screening", "phone_screen", "in_progress"),
+    ("Interview", "interview", "in_progress"),
+    ("Assignment", "evaluation", "in_progress"),
+    ("Offer", "offer", "in_progress"),
+    ("Hired", "hire", "hired"),
+]
+SALARIES = ["{0} PLN", "{0}", "{0} zł brutto", "{1}k", "{0}-{2}", "negotiable", "", "B2B {0} net"]
+METRIC_KINDS = {
+    "single_metric": ["fill_rate", "hires", "applications", "time_to_hire", "offer_acceptance_rate"],
+    "trend": ["applications_over_time", "hires_over_time", "disqualifications_over_time"],
+    "breakdown": ["jobs", "sources", "disqualify_reasons", "stages"],
+    "funnel": ["dropoff_rate", "conversion_rate"],
+    "time_based": ["custom_time_based"],
+}
+# Window in seconds over which the stand-in counts requests against its own rate limit
+_RATE_WINDOW = 1.0
+
+
+def _iso(timestamp: float | None) -> str | None:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z") if timestamp is not None else None
+
+
+class Dataset:
+    """The synthetic company. Everything derives from `seed`, candidates from `seed` and their id."""
+
+    def __init__(self, offers: int = 50, candidates: int = 1000, seed: int = 0, templates: int = 8):
+        self.seed = seed
+        self.candidate_count = candidates
+        rng = random.Random(seed)
+
+        self.templates = {
+            t: [
+                {"id": t * 100 + i, "name": name, "category": category, "group": group, "position": i}
+                for i, (name, category, group) in enumerate(STAGES[:rng.randint(4, len(STAGES) - 1)] + [STAGES[-1]])
+            ]
+            for t in range(1, templates + 1)
+        }
+        self.stage_names = {s["id"]: s["name"] for stages in self.templates.values() for s in stages}
+        self.offers = [
+            {
+                "id": i,
+                "title": f"{rng.choice(TITLES)} {i}",
+                "status": rng.choices(["published", "internal", "closed", "draft", "archived"], [5, 2, 2, 1, 1])[0],
+                "priority": rng.choice(["normal", "high"]),
+                "location": rng.choice(CITIES),
+                "created_at": _iso(EPOCH - rng.randint(0, _YEAR)),
+            }
+            for i in range(1, offers + 1)
+        ]
+        self.offer_templates = {o["id"]: rng.randint(1, templates) for o in self.offers}
+        self.tags = [{"id": i, "name": f"tag-{i}", "taggings_count": 0} for i in range(1, 51)]
+        self.talent_pools = [
+            {"id": i, "title": f"{rng.choice(TITLES)} pool {i}", "status": "archived" if i % 5 == 0 else "active"}
+            for i in range(1, 21)
+        ]
+        self.disqualify_reasons = [
+            {"id": i, "name": name}
+            for i, name in enumerate(["Not qualified", "Salary expectations", "Withdrew", "No show", "Position filled", "Culture fit", "Relocation", "Other"], 1)
+        ]
+        self.custom_fields = [
+            {"id": 1, "name": "Salary expectation", "kind": "single_line", "search_key": "custom_fields.salary_expectation"},
+            {"id": 2, "name": "Notice period", "kind": "dropdown", "search_key": "custom_fields.notice_period"},
+            {"id": 3, "name": "Languages", "kind": "multi_select", "search_key": "custom_fields.languages"},
+        ]
+
+        # Search hits, plus what the search filters need, without the full details
+        self.rows = []
+        self._facets = []
+        for candidate_id in range(1, candidates + 1):
+            candidate = self.candidate(candidate_id)
+            self.rows.append({
+                "id": candidate_id,
+                "name": candidate["name"],
+                "emails": candidate["emails"],
+                "created_at": EPOCH - candidate["_age"],
+                "updated_at": EPOCH - candidate["_age"] + candidate_id % 86400,
+            })
+            self._facets.append({
+                "jobs": {p["offer_id"] for p in candidate["placements"]},
+                "tags": candidate["_tag_ids"],
+                "stages": {self.stage_names[p["stage_id"]] for p in candidate["placements"]},
+                "disqualifies": {p["_reason"] for p in candidate["placements"] if p["_reason"]},
+                "talent_pools": candidate["_pool_ids"],
+            })
+        # What the full-text "all" filter looks in
+        self._text = [" ".join([row["name"], *row["emails"]]).lower() for row in self.rows]
+        # Facet value -> indexes of the candidates having it, for the "in" filters
+        self._postings: dict[str, dict] = {}
+        for index, facets in enumerate(self._facets):
+            for facet, values in facets.items():
+                for value in values:
+                    self._postings.setdefault(facet, {}).setdefault(value, []).append(index)
+        for tag_id, indexes in self._postings.get("tags", {}).items():
+            self.tags[tag_id - 1]["taggings_count"] = len(indexes)
+
+    def offer(self, offer_id: int) -> dict:
+        template_id = self.offer_templates[offer_id]
+        stages = self.templates[template_id]
+        return {
+            **self.offers[offer_id - 1],
+            "description": "<p>Synthetic offer</p>" * 20,
+            "pipeline_template": {"id": template_id, "name": f"Pipeline {template_id}", "stages": stages},
+        }
+
+    def candidate(self, candidate_id: int) -> dict:
+        """Full details. Keys starting with '_' are for the search index and are dropped from responses."""
+        rng = random.Random(self.seed * 1_000_003 + candidate_id)
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {candidate_id}"
+        age = rng.randint(0, _YEAR)
+        created = EPOCH - age
+
+        placements = []
+        for offer_id in rng.sample(range(1, len(self.offers) + 1), k=min(len(self.offers), rng.choice([1, 1, 1, 2, 3]))):
+            stages = self.templates[self.offer_templates[offer_id]]
+            stage = rng.choice(stages)
+            applied = created + rng.randint(0, 30 * 86400)
+            moved = applied + rng.randint(0, 60 * 86400) * stage["position"]
+            hired = moved if stage["category"] == "hire" else None
+            reason = rng.choice(self.disqualify_reasons)["name"] if hired is None and rng.random() < 0.3 else None
+            placements.append({
+                "id": candidate_id * 10 + len(placements),
+                "offer_id": offer_id,
+                "stage_id": stage["id"],
+                "created_at": _iso(applied),
+                "updated_at": _iso(moved),
+                "hired_at": _iso(hired),
+                "disqualified_at": _iso(moved + 86400) if reason else None,
+                "disqualify_reason": {"name": reason} if reason else None,
+                "_reason": reason,
+            })
+
+        salary = rng.randrange(4000, 30000, 500)
+        tag_ids = set(rng.sample(range(1, len(self.tags) + 1), k=rng.randint(0, 3)))
+        return {
+            "id": candidate_id,
+            "name": name,
+            "emails": [f"{name.split()[0].lower()}.{candidate_id}@example.com"],
+            "phones": [f"+48 600 {candidate_id % 1000:03d} {candidate_id // 1000 % 1000:03d}"],
+            "created_at": _iso(created),
+            "updated_at": _iso(created + candidate_id % 86400),
+            "sources": [rng.choice(SOURCES)],
+            "tags": [self.tags[t - 1]["name"] for t in sorted(tag_ids)],
+            "fields": [
+                {"name": "Salary expectation", "kind": "single_line", "values": [{"text": rng.choice(SALARIES).format(salary, salary / 1000, salary + 2000)}]},
+                {"name": "Notice period", "kind": "dropdown", "values": [{"text": rng.choice(["None", "2 weeks", "1 month", "3 months"])}]},
+            ],
+            "placements": placements,
+            "notes_count": rng.randint(0, 12),
+            "cover_letter": "Synthetic cover letter. " * rng.randint(0, 40),
+            "_age": age,
+            "_tag_ids": tag_ids,
+            "_pool_ids": set(rng.sample(range(1, len(self.talent_pools) + 1), k=rng.randint(0, 2))),
+        }
+
+    def notes(self, candidate_id: int, count: int) -> list[dict]:
+        rng = random.Random(self.seed * 1_000_033 + candidate_id)
+        return [
+            {
+                "id": candidate_id * 100 + i,
+                "body": f"Note {i} about candidate {candidate_id}. " + "Lorem ipsum dolor sit amet. " * rng.randint(1, 10),
+                "created_at": _iso(EPOCH - rng.randint(0, _YEAR)),
+                "admin": {"id": rng.randint(1, 20), "name": f"Recruiter {rng.randint(1, 20)}"},
+            }
+            for i in range(count)
+        ]
+
+    def matches(self, index: int, search_filter: dict) -> bool:
+        """Whether candidate `index` (0-based) passes one filters_json entry. Unknown filters match everyone."""
+        row, facets = self.rows[index], self._facets[index]
+        field = search_filter.get("field")
+        if field == "all":
+            return search_filter["query"].lower() in self._text[index]
+        if field in row:
+            return search_filter.get("gte", row[field]) <= row[field] <= search_filter.get("lte", row[field])
+
+        values = facets.get(search_filter.get("filter"))
+        if values is None:
+            return True
+        for key in ("id", "name", "reason"):
+            condition = search_filter.get(key)
+            if isinstance(condition, dict):
+                break
+        else:
+            condition = search_filter
+        if "in" in condition:
+            return bool(values & set(condition["in"]))
+        if "not_in" in condition:
+            return not values & set(condition["not_in"])
+        if "all_in" in condition:
+            return set(condition["all_in"]) <= values
+        if condition.get("has_any"):
+            return bool(values)
+        if condition.get("has_none"):
+            return not values
+        return True
+
+    def search(self, filters: list[dict]) -> list[dict]:
+        """Search hits matching every filter, in id order."""
+        indexes = None
+        rest = []
+        for search_filter in filters:
+            if search_filter.get("field") == "all":
+                query = search_filter["query"].lower()
+                found = {i for i, text in enumerate(self._text) if query in text}
+                indexes = found if indexes is None else indexes & found
+                continue
+            condition = next((search_filter[key] for key in ("id", "name", "reason") if isinstance(search_filter.get(key), dict)), {})
+            postings = self._postings.get(search_filter.get("filter"))
+            if postings is None or "in" not in condition:
+                rest.append(search_filter)
+                continue
+            found = {i for value in condition["in"] for i in postings.get(value, ())}
+            indexes = found if indexes is None else indexes & found
+        candidates = range(len(self.rows)) if indexes is None else sorted(indexes)
+        return [self.rows[i] for i in candidates if all(self.matches(i, f) for f in rest)]
+
+    def report(self, kind: str, params: dict) -> dict:
+        rng = random.Random(json.dumps([self.seed, kind, params], sort_keys=True))
+        metric = params.get("metric", "")
+        if kind == "single_metric":
+            results = {"value": round(rng.uniform(0, 100), 2)}
+        elif kind == "trend":
+            results = [{"date": _iso(EPOCH - i * 30 * 86400)[:10], "value": rng.randint(0, 500)} for i in range(12)]
+        elif kind == "breakdown":
+            groups = self.offers[:int(params.get("limit") or 30)]
+            results = [{"group": {"id": o["id"], "name": o["title"]}, "value": rng.randint(0, 200)} for o in groups]
+        elif kind == "funnel":
+            results = [{"stage": name, "value": rng.randint(0, 1000)} for name, _, _ in STAGES]
+        else:
+            results = {"average_days": round(rng.uniform(5, 60), 1), "median_days": round(rng.uniform(5, 60), 1)}
+        return {"results": results, "meta": {"metric": metric, "kind": kind, "date_range": params.get("date_range", "all_time")}}
+
+    def metrics(self) -> list[dict]:
+        return [
+            {
+                "metric": metric,
+                "name": metric.replace("_", " ").capitalize(),
+                "resource": "candidates" if kind != "breakdown" else "jobs",
+                "kind": kind,
+                "available_filters": ["job", "department", "location", "source"],
+                "available_groups": ["job", "department", "source", "stage"],
+                "available_date_filters": ["all_time", "last_30_days", "this_year", "range"],
+                "is_sortable": kind == "breakdown",
+            }
+            for kind, names in METRIC_KINDS.items() for metric in names
+        ]
+
+
+def create_app(
+    latency: float = 0.0,
+    offers: int = 50,
+    candidates: int = 1000,
+    *,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    rate_limit: float | None = None,
+    retry_after: float = 1.0,
+    seed: int = 0,
+    dataset: Dataset | None = None,
+) -> Starlette:
+    """
+    Build the stand-in ASGI app serving `dataset`, or a new one of `offers` offers and `candidates` candidates.
+    Every response is delayed by `latency` plus up to `jitter` seconds. A share `error_rate` of the requests,
+    and every request over `rate_limit` per second, get a 429 with a Retry-After of `retry_after` seconds.
+    The dataset is on `app.state.dataset` and the number of requests served per status on `app.state.requests`.
+    """
+    data = dataset or Dataset(offers, candidates, seed)
+    faults = random.Random(seed)
+    # Results of recent searches by filters_json, so paging through 100k matches doesn't filter them again each page
+    searches: dict[str, list[dict]] = {}
+    window = {"started": 0.0, "count": 0}
+    served: dict[int, int] = {}
+
+    def public(record: dict) -> dict:
+        return {k: public(v) if isinstance(v, dict) else [public(i) if isinstance(i, dict) else i for i in v] if isinstance(v, list) else v
+                for k, v in record.items() if not k.startswith("_")}
+
+    def respond(payload: dict, status_code: int = 200, headers: dict | None = None) -> JSONResponse:
+        served[status_code] = served.get(status_code, 0) + 1
+        return JSONResponse(payload, status_code=status_code, headers=headers)
+
+    def endpoint(handler):
+        async def wrapped(request: Request):
+            if latency or jitter:
+                await asyncio.sleep(latency + faults.uniform(0, jitter))
+            throttled = error_rate and faults.random() < error_rate
+            if rate_limit:
+                now = time.monotonic()
+                if now - window["started"] >= _RATE_WINDOW:
+                    window["started"], window["count"] = now, 0
+                window["count"] += 1
+                throttled = throttled or window["count"] > rate_limit * _RATE_WINDOW
+            if throttled:
+                return respond({"error": "Too many requests"}, 429, {"Retry-After": f"{retry_after:g}"})
+            return handler(request)
+        return wrapped
+
+    def not_found() -> JSONResponse:
+        return respond({"error": "Not found"}, 404)
+
+    def list_offers(request: Request):
+        return respond({"offers": data.offers})
+
+    def offer_detail(request: Request):
+        offer_id = int(request.path_params["offer_id"])
+        if not 1 <= offer_id <= len(data.offers):
+            return not_found()
+        return respond({"offer": data.offer(offer_id)})
+
+    def search_candidates(request: Request):
+        filters_json = request.query_params.get("filters_json") or "[]"
+        limit = int(request.query_params.get("limit", 100))
+        offset = int(request.query_params.get("offset", 0))
+        hits = searches.get(filters_json)
+        if hits is None:
+            hits = data.search(json.loads(filters_json))
+            if len(searches) >= 64:
+                searches.clear()
+            searches[filters_json] = hits
+        return respond({"hits": hits[offset:offset + limit], "total": len(hits)})
+
+    def candidate_detail(request: Request):
+        candidate_id = int(request.path_params["candidate_id"])
+        if not 1 <= candidate_id <= data.candidate_count:
+            return not_found()
+        return respond({"candidate": public(data.candidate(candidate_id))})
+
+    def candidate_notes(request: Request):
+        candidate_id = int(request.path_params["candidate_id"])
+        if not 1 <= candidate_id <= data.candidate_count:
+            return not_found()
+        limit = int(request.query_params.get("limit", 100))
+        offset = int(request.query_params.get("offset", 0))
+        notes = data.notes(candidate_id, data.candidate(candidate_id)["notes_count"])
+        return respond({"notes": notes[offset:offset + limit]})
+
+    def talent_pools(request: Request):
+        return respond({"talent_pools": data.talent_pools})
+
+    def talent_pool_detail(request: Request):
+        pool_id = int(request.path_params["pool_id"])
+        if not 1 <= pool_id <= len(data.talent_pools):
+            return not_found()
+        return respond({"talent_pool": {**data.talent_pools[pool_id - 1], "candidates_count": data.candidate_count // 10}})
+
+    def report_metrics(request: Request):
+        return respond({"metrics": data.metrics()})
+
+    def report(request: Request):
+        kind = request.path_params["kind"]
+        if kind not in METRIC_KINDS:
+            return not_found()
+        return respond(data.report(kind, dict(request.query_params)))
+
+    routes = {
+        "/offers": list_offers,
+        "/offers/{offer_id:int}": offer_detail,
+        "/search/new/candidates": search_candidates,
+        "/candidates/{candidate_id:int}": candidate_detail,
+        "/candidates/{candidate_id:int}/notes": candidate_notes,
+        "/talent_pools": talent_pools,
+        "/talent_pools/{pool_id:int}": talent_pool_detail,
+        "/disqualify_reasons": lambda request: respond({"disqualify_reasons": data.disqualify_reasons}),
+        "/tags": lambda request: respond({"tags": data.tags}),
+        "/custom_fields/fields/searchable": lambda request: respond({"fields": data.custom_fields}),
+        "/report/metrics": report_metrics,
+        "/report/{kind}": report,
+    }
+    app = Starlette(routes=[Route(f"/c/{{company_id}}{path}", endpoint(handler)) for path, handler in routes.items()])
+    app.state.dataset = data
+    app.state.requests = served
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def serve_in_thread(app, port: int | None = None):
+    """Run `app` with uvicorn in a background thread and yield its base URL."""
+    port = port or free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def _serve(port: int, app_kwargs: dict) -> None:
+    uvicorn.run(create_app(**app_kwargs), host="127.0.0.1", port=port, log_level="warning")
+
+
+@contextmanager
+def serve_in_process(port: int | None = None, timeout: float = 120.0, **app_kwargs):
+    """
+    Run `create_app(**app_kwargs)` in a child process and yield its base URL once it accepts connections.
+    Unlike `serve_in_thread`, the stand-in's own work (e.g. filtering 100k candidates) doesn't hold our GIL.
+    """
+    port = port or free_port()
+    process = multiprocessing.get_context("spawn").Process(target=_serve, args=(port, app_kwargs), daemon=True)
+    process.start()
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if not process.is_alive() or time.monotonic() > deadline:
+                    raise RuntimeError("Stand-in didn't start")
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.join()
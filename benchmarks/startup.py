@@ -0,0 +1,92 @@
+"""Cold start of the stdio server: time from process spawn to the first tool response.
+
+Run with `make bench-startup` or `python -m benchmarks.startup --runs 5 --budget 2.5`.
+Each run starts a fresh `python -m src.app --transport stdio` against the local stand-in, sends
+`initialize` and then calls `list_offers`. Exits with status 1 if the median time to the first
+tool response is over the budget, so it can guard cold start regressions in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.standin import create_app, serve_in_thread
+
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _send(process: subprocess.Popen, message: dict) -> None:
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+
+
+def _receive(process: subprocess.Popen, request_id: int) -> dict:
+    """Read lines until the response to `request_id`, skipping anything that isn't JSON-RPC."""
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Server exited before answering request {request_id}")
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if message.get("id") == request_id:
+            return message
+
+
+def measure(url: str) -> dict[str, float]:
+    env = {**os.environ, "RECRUITEE_API_URL": url, "RECRUITEE_COMPANY_ID": "bench", "RECRUITEE_API_TOKEN": "bench"}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.app", "--transport", "stdio"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        cwd=_PROJECT_DIR,
+        env=env,
+    )
+    try:
+        _send(process, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+            "protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "bench", "version": "0"},
+        }})
+        _receive(process, 1)
+        initialized = time.perf_counter() - start
+        _send(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _send(process, {"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": "list_offers", "arguments": {}}})
+        response = _receive(process, 2)
+        if "error" in response or response["result"].get("isError"):
+            raise RuntimeError(f"list_offers failed: {response}")
+        first_tool = time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+    return {"initialize": initialized, "first tool response": first_tool}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to measure (default: 5).")
+    parser.add_argument("--budget", type=float, default=2.5, help="Max median seconds to the first tool response (default: 2.5).")
+    args = parser.parse_args()
+
+    with serve_in_thread(create_app()) as url:
+        runs = [measure(url) for _ in range(args.runs)]
+
+    print(f"{'step':<22}{'median s':>10}{'max s':>10}")
+    for step in runs[0]:
+        timings = [run[step] for run in runs]
+        print(f"{step:<22}{statistics.median(timings):>10.3f}{max(timings):>10.3f}")
+
+    median = statistics.median(run["first tool response"] for run in runs)
+    if median > args.budget:
+        print(f"\nFAIL: median time to first tool response {median:.3f} s is over the {args.budget} s budget")
+        raise SystemExit(1)
+    print(f"\nOK: median time to first tool response {median:.3f} s is within the {args.budget} s budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Latency and throughput of each tool, end to end through an in-memory MCP client, against the synthetic stand-in.
+
+Run with `make bench-tools` or `python -m benchmarks.tools --candidates 100000 --offers 2000 --latency 0.02`.
+Each scenario calls one tool `--iterations` times from `--concurrency` concurrent callers, after one
+untimed warm-up call, and reports p50/p99 latency, calls per second and Recruitee requests per call.
+Arguments vary between calls (other offers, candidates, metric filters), so caches only help as much as
+they would for a real agent.
+
+Save a run with `--save baseline.json`, then check later runs with `--baseline baseline.json`: the run
+fails (exit code 1) when a scenario's p50 or p99 is more than `--tolerance` slower than the baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from benchmarks.standin import Dataset, serve_in_process
+
+
+
+def scenarios(data: Dataset, candidates: int) -> dict[str, tuple[str, callable]]:
+    """Scenario name -> (tool, function of a random.Random returning the tool arguments)."""
+    candidate_ids = lambda rng, n: rng.sample(range(1, candidates + 1), k=min(n, candidates))
+    offer_id = lambda rng: rng.randint(1, len(data.offers))
+    return {
+        "list_offers": ("list_offers", lambda rng: {}),
+        "list_tags": ("list_tags", lambda rng: {}),
+        "resolve_entities": ("resolve_entities", lambda rng: {"names": [rng.choice(data.offers)["title"], "Screening", f"tag-{rng.randint(1, 50)}"]}),
+        "search_page": ("search_candidates", lambda rng: {"search_filter": {"offer_ids": [offer_id(rng)], "limit": 100}}),
+        "search_all_pages": ("search_candidates", lambda rng: {"search_filter": {"on_stage": ["Interview"], "auto_paginate": True, "max_results": 5000}, "format": "columnar"}),
+        "search_by_query": ("search_candidate_by_query", lambda rng: {"query": f"{rng.choice(['Nowak', 'Smith', 'Anna'])} {rng.randint(1, 9)}", "limit": 50}),
+        "candidates_details_50": ("get_candidates_details", lambda rng: {"candidate_ids": candidate_ids(rng, 50), "fields": []}),
+        "candidates_notes_20": ("get_candidates_notes", lambda rng: {"candidate_ids": candidate_ids(rng, 20)}),
+        "offers_stages_20": ("get_offers_stages", lambda rng: {"offer_ids": [offer_id(rng) for _ in range(20)]}),
+        "single_metric": ("get_single_metric_data", lambda rng: {"mqp": {"metric": "fill_rate", "filters": f"job:{offer_id(rng)}"}}),
+        "metrics_batch_10": ("get_metrics_batch", lambda rng: {"queries": [
+            {"id": f"q{i}", "kind": kind, "mqp": {"metric": metric, "filters": f"job:{offer_id(rng)}"}}
+            for i, (kind, metric) in enumerate([("single", "hires"), ("trend", "applications_over_time"), ("breakdown", "sources"), ("funnel", "dropoff_rate"), ("time_based", "custom_time_based")] * 2)
+        ]}),
+        "stage_times": ("get_stage_times", lambda rng: {"offer_id": offer_id(rng), "max_candidates": 500}),
+        "aggregate_salary": ("aggregate_candidates", lambda rng: {"field": "Salary expectation", "group_by": "source", "max_candidates": 500}),
+    }
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))]
+
+
+async def run(names: list[str], data: Dataset, candidates: int, iterations: int, concurrency: int, seed: int) -> dict[str, dict]:
+    from fastmcp import Client
+    from fastmcp.exceptions import ToolError
+
+    from src.app import mcp
+    from src.tools import utils
+
+    results = {}
+    await utils.open_http_client()
+    try:
+        async with Client(mcp) as client:
+            for name in names:
+                tool, arguments = scenarios(data, candidates)[name]
+                rng = random.Random(seed)
+                errors = []
+
+                async def call() -> float:
+                    started = time.perf_counter()
+                    try:
+                        await client.call_tool(tool, arguments(rng))
+                    except ToolError as e:
+                        errors.append(str(e))
+                    return time.perf_counter() - started
+
+                await call()
+                queue = iter(range(iterations))
+                latencies = []
+
+                async def caller() -> None:
+                    for _ in queue:
+                        latencies.append(await call())
+
+                upstream = utils._coalescing_stats["upstream_calls"]
+                started = time.perf_counter()
+                await asyncio.gather(*(caller() for _ in range(concurrency)))
+                elapsed = time.perf_counter() - started
+                results[name] = {
+                    "tool": tool,
+                    "calls": iterations,
+                    "errors": len(errors),
+                    "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                    "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                    "calls_per_s": round(iterations / elapsed, 2),
+                    "upstream_per_call": round((utils._coalescing_stats["upstream_calls"] - upstream) / iterations, 1),
+                }
+                if errors:
+                    results[name]["first_error"] = errors[0][:200]
+    finally:
+        await utils.close_http_client()
+    return results
+
+
+def upstream_statuses() -> dict[str, int]:
+    from src.utils.telemetry import upstream_requests
+
+    statuses = {}
+    for (_, status), count in upstream_requests._values.items():
+        statuses[str(status)] = statuses.get(str(status), 0) + int(count)
+    return dict(sorted(statuses.items()))
+
+
+def regressions(results: dict[str, dict], baseline: dict[str, dict], tolerance: float, noise_ms: float) -> list[str]:
+    """Scenarios slower than the baseline by more than `tolerance` (and `noise_ms`), or failing where they didn't."""
+    failures = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["errors"] > base.get("errors", 0):
+            failures.append(f"{name}: {result['errors']} errors, baseline {base.get('errors', 0)}")
+        for key in ("p50_ms", "p99_ms"):
+            limit = max(base[key] * (1 + tolerance), base[key] + noise_ms)
+            if result[key] > limit:
+                failures.append(f"{name}: {key} {result[key]:.1f} over {limit:.1f} (baseline {base[key]:.1f})")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=100_000, help="Synthetic candidates (default: 100000).")
+    parser.add_argument("--offers", type=int, default=2000, help="Synthetic offers (default: 2000).")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stand-in latency per request in seconds (default: 0.02).")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Random extra latency per request, up to this many seconds (default: 0.01).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stand-in requests answered with a 429 (default: 0).")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="Retry-After of the injected 429s in seconds (default: 0.1).")
+    parser.add_argument("--standin-rate-limit", type=float, default=None, help="Requests per second the stand-in serves before answering 429 (default: unlimited).")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Recruitee requests per second allowed by our client (default: unlimited).")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed calls per scenario (default: 20).")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent callers per scenario (default: 4).")
+    parser.add_argument("--only", default="", help="Comma-separated scenarios to run (default: all).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the dataset and of the tool arguments (default: 0).")
+    parser.add_argument("--save", help="Write the results as JSON to this file, e.g. to use as a baseline.")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50/p99 slowdown against the baseline (default: 0.25, i.e. 25%%).")
+    parser.add_argument("--noise-ms", type=float, default=5.0, help="Slowdowns under this many ms never fail (default: 5).")
+    args = parser.parse_args()
+
+    # Same offers as the stand-in's dataset, for the tool arguments; its candidates are only counted
+    data = Dataset(args.offers, 0, args.seed)
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or list(scenarios(data, args.candidates))
+    unknown = set(names) - set(scenarios(data, args.candidates))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    started = time.perf_counter()
+    with serve_in_process(
+        latency=args.latency, offers=args.offers, candidates=args.candidates,
+        jitter=args.jitter, error_rate=args.error_rate, rate_limit=args.standin_rate_limit, retry_after=args.retry_after, seed=args.seed,
+    ) as url:
+        print(f"stand-in with {args.candidates} candidates and {args.offers} offers up in {time.perf_counter() - started:.1f} s")
+        os.environ["RECRUITEE_API_URL"] = url
+        os.environ.setdefault("RECRUITEE_COMPANY_ID", "bench")
+        os.environ.setdefault("RECRUITEE_API_TOKEN", "bench")
+        os.environ["RECRUITEE_RATE_LIMIT"] = str(args.rate_limit or 1_000_000)
+        os.environ["RECRUITEE_RATE_BURST"] = str(int(args.rate_limit or 1_000_000))
+        results = asyncio.run(run(names, data, args.candidates, args.iterations, args.concurrency, args.seed))
+
+    print(f"{'scenario':<24}{'p50 ms':>10}{'p99 ms':>10}{'calls/s':>10}{'upstream':>10}{'errors':>8}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['calls_per_s']:>10.1f}{r['upstream_per_call']:>10.1f}{r['errors']:>8}")
+    print(f"Recruitee responses by status: {upstream_statuses()}")
+    for name, r in results.items():
+        if "first_error" in r:
+            print(f"{name} error: {r['first_error']}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = regressions(results, json.load(f), args.tolerance, args.noise_ms)
+        if failures:
+            print("\nFAIL: slower than the baseline\n  " + "\n  ".join(failures))
+            raise SystemExit(1)
+        print(f"\nOK: every scenario within {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,66 @@
 import os
+import asyncio
 import argparse
+from contextlib import asynccontextmanager
 
-import uvicorn
-from fastapi.staticfiles import StaticFiles
+from src.utils.server_config import mcp, SERVER_WORKERS
+from src.utils.store import shared_store
+from src.utils.cache import refresh_forever
+from src.utils.telemetry import monitor_event_loop
 
-from src.utils.server_config import mcp
-from src.utils.auth import BearerAuthMiddleware, LoginPasswordMiddleware, limiter
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-
-from src.tools import candidates, offers, lookup, metrics, utils  # noqa: F401
+# The HTTP server, auth and rate limiting stack (uvicorn, slowapi) is imported by the
+# streamable-http code paths only, so stdio sessions don't pay for it on cold start
+from src.tools import analytics, candidates, candidate_mirror, offers, lookup, metrics, resolve, utils  # noqa: F401
 from src.prompts import prompts # noqa: F401
 
 
 
+@asynccontextmanager
+async def lifespan():
+    """Process-wide resources shared by all MCP sessions, regardless of transport."""
+    from src.utils.documents import retention_forever
+
+    await utils.open_http_client()
+    mirror_sync = asyncio.create_task(candidate_mirror.mirror.sync_forever()) if candidate_mirror.mirror else None
+    retention = asyncio.create_task(retention_forever())
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    # Lookups are warmed up and refreshed in the background, behind interactive requests
+    with utils.upstream_priority(utils.PRIORITY_BULK):
+        lookup_refresh = asyncio.create_task(refresh_forever())
+    try:
+        yield
+    finally:
+        if mirror_sync is not None:
+            mirror_sync.cancel()
+        retention.cancel()
+        loop_monitor.cancel()
+        lookup_refresh.cancel()
+        await utils.close_http_client()
+
+
+def add_lifespan(app):
+    """Helper function to run `lifespan` around the HTTP app's own lifespan (session manager)."""
+    app_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def combined_lifespan(starlette_app):
+        async with lifespan():
+            async with app_lifespan(starlette_app) as state:
+                yield state
+
+    app.router.lifespan_context = combined_lifespan
+
+
+async def run_with_lifespan(**kwargs):
+    """Run the MCP server for the transports whose event loop is owned by FastMCP."""
+    async with lifespan():
+        await mcp.run_async(**kwargs)
+
+
 def mount_static_files(app):
     """Helper function to mount static files to the FastAPI app."""
+    from src.utils.documents_static import DocumentsStaticFiles
+
     # Use Fly volume mount path for persistent storage
     documents_dir = os.getenv("DOCUMENTS_DIR") or "./data"
     
@@ -23,7 +68,7 @@ def mount_static_files(app):
     os.makedirs(documents_dir, exist_ok=True)
     
     if os.path.exists(documents_dir):
-        app.mount("/documents", StaticFiles(directory=documents_dir), name="documents")
+        app.mount("/documents", DocumentsStaticFiles(directory=documents_dir), name="documents")
         print(f"Static files mounted at /documents from {documents_dir}")
         return True
     else:
@@ -31,6 +76,37 @@ def mount_static_files(app):
         return False
 
 
+def create_http_app(path: str | None = None):
+    """
+    Build the streamable-http app. Also the uvicorn factory of `--workers` mode, where every worker
+    builds its own app and `path` comes from the environment set by the parent process.
+    """
+    from slowapi import _rate_limit_exceeded_handler
+    from slowapi.errors import RateLimitExceeded
+    from src.utils.auth import BearerAuthMiddleware, LoginPasswordMiddleware, limiter
+    from src.utils.admin import metrics_endpoint, profile_endpoint, traces_endpoint
+
+    app = mcp.http_app(
+        path=path or os.getenv("MCP_HTTP_PATH") or "/mcp",
+        # Sessions live in the memory of one process, while requests land on any worker
+        stateless_http=True if SERVER_WORKERS > 1 else None,
+    )
+    # Configure rate limiter
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    
+    app.add_route("/metrics", metrics_endpoint, methods=["GET"])
+    app.add_route("/admin/traces", traces_endpoint, methods=["GET"])
+    app.add_route("/admin/profile", profile_endpoint, methods=["GET"])
+
+    # Add security middlewares
+    app.add_middleware(BearerAuthMiddleware, protected_paths=["/mcp", "/metrics", "/admin"])
+    app.add_middleware(LoginPasswordMiddleware, protected_paths=["/documents"])
+    mount_static_files(app)
+    add_lifespan(app)
+    return app
+
+
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Run the Recruitee MCP server.")
@@ -56,6 +132,17 @@ def parse_args() -> argparse.Namespace:
         required=False,
         help="Mount path for HTTP/SSE (default /mcp or /sse)."
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of server processes for streamable-http (default: 1). Set SHARED_STORE_URL so they share caches and rate limits."
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print the import time breakdown of a cold start with the given transport, then exit."
+    )
 
     parser_args = parser.parse_args()
 
@@ -69,37 +156,41 @@ def parse_args() -> argparse.Namespace:
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.profile_startup:
+        from src.utils.profiling import profile_startup
+        profile_startup(args.transport)
+        raise SystemExit()
+
     if not os.getenv("RECRUITEE_API_TOKEN") or not os.getenv("RECRUITEE_COMPANY_ID"):
         raise SystemExit("Please set RECRUITEE_COMPANY_ID and RECRUITEE_API_TOKEN in your environment variables.")
 
-    args = parse_args()
     if args.transport == "stdio":
         print("Starting MCP server in stdio mode...")
-        mcp.run(
+        asyncio.run(run_with_lifespan(
             transport=args.transport,
-        )
+        ))
 
     elif args.transport == "streamable-http":
+        import uvicorn
+
         print(f"Starting MCP server in streamable-http mode at http://{args.host}:{args.port}{args.path}")
-        app = mcp.http_app(
-            path=args.path,
-        )
-        # Configure rate limiter
-        app.state.limiter = limiter
-        app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-        
-        # Add security middlewares
-        app.add_middleware(BearerAuthMiddleware, protected_paths=["/mcp"])
-        app.add_middleware(LoginPasswordMiddleware, protected_paths=["/documents"])
-        mount_static_files(app)
-        uvicorn.run(app, host=args.host, port=args.port)
+        if args.workers > 1:
+            if shared_store is None:
+                print("Warning: SHARED_STORE_URL is not set, every worker keeps its own caches and rate limits")
+            # Read by the workers, which import this module anew
+            os.environ["MCP_HTTP_PATH"] = args.path
+            os.environ["SERVER_WORKERS"] = str(args.workers)
+            uvicorn.run("src.app:create_http_app", factory=True, host=args.host, port=args.port, workers=args.workers)
+        else:
+            uvicorn.run(create_http_app(args.path), host=args.host, port=args.port)
 
     elif args.transport == "sse":
         print(f"Starting MCP server in SSE mode at http://{args.host}:{args.port}{args.path}")
-        mcp.run(
+        asyncio.run(run_with_lifespan(
             transport=args.transport,
             path=args.path,
             host=args.host,
             port=args.port,
-        )
+        ))
 
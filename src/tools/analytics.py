@@ -0,0 +1,204 @@
+import time
+from typing import Annotated, Literal, Optional
+
+from pydantic import Field
+
+from src.utils.server_config import mcp
+from src.tools.candidates import CandidateSearchFilter, iter_search_candidates, _get_candidates_details
+from src.tools.offers import _fetch_offers_stages
+
+
+
+Percentiles = Annotated[
+    Optional[list[float]],
+    Field(description="Percentiles to compute, between 0 and 100 (default: 50, 75, 90)."),
+]
+MaxCandidates = Annotated[
+    int,
+    Field(description="Maximum number of matching candidates included (max 10 000). Each one is fetched from Recruitee, so large values are slow."),
+]
+
+_DAY = 24 * 3600
+# Most frequent values listed per group for non-numeric fields
+_TOP_VALUES = 50
+
+
+async def _matching_candidates(
+    offer_id: Optional[int], search_filter: Optional[CandidateSearchFilter], max_candidates: int, fields: list[str]
+) -> tuple[list[dict], int]:
+    """Details of the candidates matching the filters, and how many of them couldn't be fetched."""
+    if not 0 < max_candidates <= 10_000:
+        raise ValueError("max_candidates must be between 1 and 10 000.")
+    search_filter = search_filter or CandidateSearchFilter()
+    if offer_id is not None:
+        search_filter = search_filter.model_copy(update={"offer_ids": [offer_id]})
+    candidate_ids = [c["id"] async for c in iter_search_candidates(search_filter, max_candidates)]
+    details = await _get_candidates_details(candidate_ids, fields)
+    fetched = [d for d in details if "error" not in d]
+    return fetched, len(details) - len(fetched)
+
+
+@mcp.tool()
+async def get_stage_times(
+    offer_id: Optional[int] = None,
+    search_filter: Optional[CandidateSearchFilter] = None,
+    percentiles: Percentiles = None,
+    max_candidates: MaxCandidates = 1000,
+) -> dict:
+    """Compute how long candidates spend in the hiring process, over every matching candidate in one call.
+'total_days' is the duration of placements from application to hire, disqualification or now (active), with count, mean, min, max and percentiles.
+'stages' lists, per pipeline stage, the active placements in it with the days since they entered it, and the placements hired or disqualified there.
+Filter candidates with 'offer_id', 'search_filter' or both. With 'offer_id' only the placements in that offer are counted.
+Prefer the 'time_spent_in_stage' metric for company-wide numbers; use this for custom candidate selections."""
+    import numpy as np
+    from src.utils.stats import check_percentiles, group_summaries, summary, timestamps
+
+    percentiles = check_percentiles(percentiles)
+    candidates, failed = await _matching_candidates(offer_id, search_filter, max_candidates, ["id", "placements"])
+    placements = [
+        p for c in candidates for p in c.get("placements") or []
+        if offer_id is None or p.get("offer_id") == offer_id
+    ]
+
+    now = time.time()
+    stage_ids = np.array([p.get("stage_id") or 0 for p in placements], dtype=np.int64)
+    applied = timestamps(p.get("created_at") for p in placements)
+    # A placement only changes when it moves, gets hired or gets disqualified, so `updated_at` of an
+    # active one is when it entered its current stage
+    moved = timestamps(p.get("updated_at") for p in placements)
+    hired = timestamps(p.get("hired_at") for p in placements)
+    disqualified = timestamps(p.get("disqualified_at") for p in placements)
+
+    is_hired = ~np.isnan(hired)
+    is_disqualified = ~is_hired & ~np.isnan(disqualified)
+    is_active = ~is_hired & ~is_disqualified
+    ended = np.where(is_hired, hired, np.where(is_disqualified, disqualified, now))
+    total_days = (ended - applied) / _DAY
+    stage_days = np.where(is_active, (now - moved) / _DAY, np.nan)
+
+    stage_names = {}
+    offer_ids = sorted({p["offer_id"] for p in placements if p.get("offer_id") is not None})
+    for offer_stages in (await _fetch_offers_stages(offer_ids)).values():
+        if isinstance(offer_stages, list):
+            stage_names.update({s["id"]: s["name"] for s in offer_stages})
+
+    in_stage = group_summaries(stage_ids, stage_days, percentiles)
+    unique_stages, inverse = np.unique(stage_ids, return_inverse=True)
+    hired_at_stage = np.bincount(inverse, weights=is_hired, minlength=len(unique_stages))
+    disqualified_at_stage = np.bincount(inverse, weights=is_disqualified, minlength=len(unique_stages))
+    stages = [
+        {
+            "stage_id": stage_id or None,
+            "name": stage_names.get(stage_id),
+            "active": in_stage.get(stage_id, {}).get("count", 0),
+            "days_in_stage": in_stage.get(stage_id),
+            "hired": int(hired_at_stage[i]),
+            "disqualified": int(disqualified_at_stage[i]),
+        }
+        for i, stage_id in enumerate(unique_stages.tolist())
+    ]
+
+    return {
+        "candidates": len(candidates),
+        "candidates_failed": failed,
+        "placements": len(placements),
+        "total_days": {
+            "hired": summary(total_days[is_hired], percentiles),
+            "disqualified": summary(total_days[is_disqualified], percentiles),
+            "active": summary(total_days[is_active], percentiles),
+        },
+        "stages": stages,
+    }
+
+
+def _field_values(candidate: dict, field: str, stage_names: dict[int, str], offer_id: Optional[int]) -> list[str]:
+    """Values of `field` for a candidate: 'source', 'tag', 'stage' or the name of a custom field."""
+    if field == "stage":
+        return [
+            stage_names.get(p.get("stage_id"), str(p.get("stage_id")))
+            for p in candidate.get("placements") or []
+            if p.get("stage_id") is not None and (offer_id is None or p.get("offer_id") == offer_id)
+        ]
+    if field in ("source", "tag"):
+        values = candidate.get(f"{field}s") or []
+        return [v.get("name", "") if isinstance(v, dict) else str(v) for v in values if v]
+
+    values = []
+    for custom_field in candidate.get("fields") or []:
+        if (custom_field.get("name") or "").casefold() != field.casefold():
+            continue
+        for value in custom_field.get("values") or []:
+            text = value.get("text", value.get("value")) if isinstance(value, dict) else value
+            if text is not None and str(text).strip():
+                values.append(str(text).strip())
+    return values
+
+
+@mcp.tool()
+async def aggregate_candidates(
+    field: str,
+    group_by: Optional[str] = None,
+    offer_id: Optional[int] = None,
+    search_filter: Optional[CandidateSearchFilter] = None,
+    value_type: Literal["auto", "number", "category"] = "auto",
+    percentiles: Percentiles = None,
+    max_candidates: MaxCandidates = 1000,
+) -> dict:
+    """Aggregate a candidate field over every matching candidate in one call, e.g. the average salary expectation for an offer.
+'field' and 'group_by' are 'source', 'tag', 'stage' or a custom field name from 'list_custom_fields' (e.g. 'Salary expectation').
+Numbers are parsed from free text ('5 000 PLN', '5,5k', '4000-6000' counts as 5000) and return count, mean, min, max, percentiles (p50 is the median) and a histogram.
+Other values return the count of each value. With 'group_by' the same is returned per group.
+Filter candidates with 'offer_id', 'search_filter' or both."""
+    import numpy as np
+    from src.utils.stats import check_percentiles, group_summaries, histogram, parse_number, summary, value_counts
+
+    percentiles = check_percentiles(percentiles)
+    fields = ["id", "placements", "fields", "tags", "sources"]
+    candidates, failed = await _matching_candidates(offer_id, search_filter, max_candidates, fields)
+
+    stage_names = {}
+    if "stage" in (field, group_by):
+        offer_ids = sorted({p["offer_id"] for c in candidates for p in c.get("placements") or [] if p.get("offer_id") is not None})
+        for offer_stages in (await _fetch_offers_stages(offer_ids)).values():
+            if isinstance(offer_stages, list):
+                stage_names.update({s["id"]: s["name"] for s in offer_stages})
+
+    # One row per (value, group) pair, so multi-valued fields such as tags count in every group they have
+    values, groups = [], []
+    with_value = 0
+    for candidate in candidates:
+        candidate_values = _field_values(candidate, field, stage_names, offer_id)
+        if not candidate_values:
+            continue
+        with_value += 1
+        candidate_groups = (_field_values(candidate, group_by, stage_names, offer_id) or ["(none)"]) if group_by else [""]
+        for value in candidate_values:
+            for group in candidate_groups:
+                values.append(value)
+                groups.append(group)
+
+    numbers = np.array([parse_number(v) for v in values], dtype=float)
+    parsed = int(np.count_nonzero(~np.isnan(numbers)))
+    # Free text fields read as numbers when most of their values are
+    numeric = value_type == "number" or (value_type == "auto" and parsed > 0 and parsed > 0.5 * len(values))
+
+    result = {
+        "candidates": len(candidates),
+        "candidates_failed": failed,
+        "candidates_with_value": with_value,
+        "type": "number" if numeric else "category",
+    }
+    if numeric:
+        result["unparsed_values"] = len(values) - parsed
+        result["summary"] = summary(numbers, percentiles)
+        result["histogram"] = histogram(numbers)
+        if group_by:
+            result["groups"] = group_summaries(np.array(groups, dtype=str), numbers, percentiles)
+    else:
+        counts = value_counts(np.array(groups, dtype=str), np.array(values, dtype=str))
+        top = {group: dict(list(group_counts.items())[:_TOP_VALUES]) for group, group_counts in counts.items()}
+        if group_by:
+            result["groups"] = top
+        else:
+            result["values"] = top.get("", {})
+    return result
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from src.utils.server_config import CANDIDATE_MIRROR_PATH, CANDIDATE_MIRROR_SYNC_INTERVAL
+from src.utils.store import acquire_lease
+from src.tools.utils import _get, upstream_priority, PRIORITY_BULK
+
+
+
+_PAGE_SIZE = 1000
+# A full sync also drops candidates deleted in Recruitee, incremental syncs only see changes
+_FULL_SYNC_INTERVAL = 24 * 3600
+# Candidates updated while a sync is paging through results are picked up again by the next one
+_WATERMARK_OVERLAP = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    emails TEXT NOT NULL,
+    generation INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS candidates_name ON candidates (name);
+CREATE TABLE IF NOT EXISTS candidate_emails (
+    email TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS candidate_emails_email ON candidate_emails (email);
+CREATE INDEX IF NOT EXISTS candidate_emails_candidate ON candidate_emails (candidate_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+    name, emails, skills, content, tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def _skills(hit: dict) -> list[str]:
+    skills = []
+    for skill in hit.get("skills") or []:
+        skills.append(skill.get("name", "") if isinstance(skill, dict) else str(skill))
+    for field in hit.get("fields") or []:
+        if field.get("kind") == "skills":
+            skills.extend(value.get("text", "") for value in field.get("values") or [])
+    return [s for s in skills if s]
+
+
+def _text(value) -> list[str]:
+    """All string leaves of a search hit, skipping URLs, for the full-text column."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [t for key, v in value.items() if not key.endswith("url") for t in _text(v)]
+    if isinstance(value, list):
+        return [t for v in value for t in _text(v)]
+    return []
+
+
+def _fts_query(query: str) -> str:
+    """Every word of the query as a quoted prefix term, all of them required."""
+    return " ".join(f'"{token}"*' for token in re.findall(r"\w+", query))
+
+
+class CandidateMirror:
+    """
+    Local SQLite copy of the candidates search index, so `search_candidate_by_query` can answer
+    name, email and full-text lookups without a Recruitee round trip. Kept up to date by `sync`,
+    which only pulls candidates updated since the previous sync (the watermark).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30.0)
+
+    def _state(self) -> dict[str, int]:
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT key, value FROM sync_state").fetchall())
+
+    def _save_state(self, state: dict[str, int]) -> None:
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", state.items())
+
+    def _upsert(self, hits: list[dict], generation: int) -> None:
+        ids = [(hit["id"],) for hit in hits]
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM candidate_emails WHERE candidate_id = ?", ids)
+            conn.executemany("DELETE FROM candidates_fts WHERE rowid = ?", ids)
+            conn.executemany(
+                "INSERT OR REPLACE INTO candidates (id, name, emails, generation) VALUES (?, ?, ?, ?)",
+                [(hit["id"], hit.get("name") or "", json.dumps(hit.get("emails") or []), generation) for hit in hits],
+            )
+            conn.executemany(
+                "INSERT INTO candidate_emails (email, candidate_id) VALUES (?, ?)",
+                [(email.lower(), hit["id"]) for hit in hits for email in hit.get("emails") or []],
+            )
+            conn.executemany(
+                "INSERT INTO candidates_fts (rowid, name, emails, skills, content) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (hit["id"], hit.get("name") or "", " ".join(hit.get("emails") or []), " ".join(_skills(hit)), " ".join(_text(hit)))
+                    for hit in hits
+                ],
+            )
+
+    def _prune(self, generation: int) -> None:
+        with self._connect() as conn:
+            stale = "SELECT id FROM candidates WHERE generation < ?"
+            conn.execute(f"DELETE FROM candidates_fts WHERE rowid IN ({stale})", (generation,))
+            conn.execute(f"DELETE FROM candidate_emails WHERE candidate_id IN ({stale})", (generation,))
+            conn.execute("DELETE FROM candidates WHERE generation < ?", (generation,))
+
+    def _search(self, query: str, search_name: bool, limit: int, offset: int) -> list[dict]:
+        if search_name:
+            sql = "SELECT id, name, emails FROM candidates WHERE name = ? ORDER BY id DESC LIMIT ? OFFSET ?"
+            args = (query, limit, offset)
+        elif "@" in query and " " not in query.strip():
+            sql = (
+                "SELECT c.id, c.name, c.emails FROM candidate_emails e JOIN candidates c ON c.id = e.candidate_id"
+                " WHERE e.email = ? ORDER BY c.id DESC LIMIT ? OFFSET ?"
+            )
+            args = (query.strip().lower(), limit, offset)
+        else:
+            match = _fts_query(query)
+            if not match:
+                return []
+            sql = (
+                "SELECT c.id, c.name, c.emails FROM candidates_fts f JOIN candidates c ON c.id = f.rowid"
+                " WHERE candidates_fts MATCH ? ORDER BY f.rank LIMIT ? OFFSET ?"
+            )
+            args = (match, limit, offset)
+        with self._connect() as conn:
+            rows = conn.execute(sql, args).fetchall()
+        return [{"id": id_, "name": name, "emails": json.loads(emails)} for id_, name, emails in rows]
+
+    async def search(self, query: str, search_name: bool, limit: int, offset: int) -> list[dict] | None:
+        """Answer a query locally, or return None while the mirror hasn't completed its first full sync."""
+        state = await asyncio.to_thread(self._state)
+        if not state.get("full_synced_at"):
+            return None
+        return await asyncio.to_thread(self._search, query, search_name, limit, offset)
+
+    async def sync(self, full: bool = False) -> int:
+        """Pull candidates changed since the watermark (or all of them for a full sync). Returns the count."""
+        state = await asyncio.to_thread(self._state)
+        started_at = int(time.time())
+        full = full or state.get("full_synced_at", 0) < started_at - _FULL_SYNC_INTERVAL
+        generation = state.get("generation", 0) + 1 if full else state.get("generation", 0)
+
+        filters = []
+        if not full:
+            filters.append({"field": "updated_at", "gte": state["watermark"] - _WATERMARK_OVERLAP})
+
+        synced = 0
+        with upstream_priority(PRIORITY_BULK):
+            while True:
+                params = {"limit": _PAGE_SIZE, "offset": synced, "filters_json": json.dumps(filters)}
+                hits = (await _get("/search/new/candidates", params=params)).get("hits", [])
+                await asyncio.to_thread(self._upsert, hits, generation)
+                synced += len(hits)
+                if len(hits) < _PAGE_SIZE:
+                    break
+
+        new_state = {"watermark": started_at, "generation": generation}
+        if full:
+            await asyncio.to_thread(self._prune, generation)
+            new_state["full_synced_at"] = started_at
+        await asyncio.to_thread(self._save_state, new_state)
+        return synced
+
+    async def sync_forever(self) -> None:
+        """Background job started with the server: sync every CANDIDATE_MIRROR_SYNC_INTERVAL seconds."""
+        while True:
+            try:
+                # With several workers, only the one holding the lease syncs
+                if await acquire_lease("candidate_mirror_sync", ttl=CANDIDATE_MIRROR_SYNC_INTERVAL * 2):
+                    await self.sync()
+            except Exception as e:
+                # stderr, stdout carries the protocol in stdio mode
+                print(f"Warning: candidate mirror sync failed: {e}", file=sys.stderr)
+            await asyncio.sleep(CANDIDATE_MIRROR_SYNC_INTERVAL)
+
+
+mirror: CandidateMirror | None = CandidateMirror(CANDIDATE_MIRROR_PATH) if CANDIDATE_MIRROR_PATH else None
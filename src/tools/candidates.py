@@ -1,12 +1,25 @@
-from typing import Dict, List, Optional, Literal
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Literal
+import asyncio
 import json
 
 from pydantic import BaseModel, Field, field_validator
 
-from src.utils.server_config import mcp
-from src.tools.utils import _get, iso_to_unix
+from src.utils.server_config import mcp, RECRUITEE_MAX_CONCURRENCY
+from src.utils.cache import TTLCache
+from src.utils.encoding import ResultFormat, MaxBytes, Cursor, decode_cursor, encode, shape_result
+from src.tools.utils import _get, iso_to_unix, gather_limited, error_message, upstream_priority, PRIORITY_BULK
+from src.tools.candidate_mirror import mirror
 
 
+_AUTO_PAGE_SIZE = 1000
+_NOTES_PAGE_SIZE = 100
+
+# Every note of a candidate, by candidate id. Short-lived, new notes are added all the time
+_notes_cache = TTLCache(maxsize=512, name="candidate_notes")
+_NOTES_TTL = 120
+
 
 class CandidateSearchFilter(BaseModel):
     offer_ids: Optional[List[int]] = Field(None, description="List of offer ids on which the candidate applied from 'list_offers'.")
@@ -37,17 +50,22 @@ class CandidateSearchFilter(BaseModel):
     limit: int = Field(100, description="Page size (max 10 000)")
     offset: int = Field(0, description="Paging offset")
 
+    auto_paginate: bool = Field(False, description="Fetch all matching candidates starting at 'offset' instead of a single page. 'limit' is ignored, use 'max_results'.")
+    max_results: int = Field(10_000, description="Maximum number of candidates returned with 'auto_paginate' (max 100 000).")
+
     @field_validator("limit")
     def _limit_max(cls, v: int) -> int:
         if v > 10_000:
             raise ValueError("Recruitee caps limit at 10 000 per call.")
         return v
 
-@mcp.tool()
-async def search_candidates(search_filter: CandidateSearchFilter) -> list[dict]:
-    """Return basic data for candidates who match a multi-field filter.
-Helper tools convert human-readable names to IDs using cached look-ups."""
+    @field_validator("max_results")
+    def _max_results_max(cls, v: int) -> int:
+        if v > 100_000:
+            raise ValueError("max_results cannot exceed 100 000.")
+        return v
 
+def _build_search_filters(search_filter: CandidateSearchFilter) -> List[Dict]:
     filters: List[Dict] = []
     if search_filter.offer_ids:
         filters.append({"filter": "jobs", "id": {"in": search_filter.offer_ids}})
@@ -97,25 +115,114 @@ Helper tools convert human-readable names to IDs using cached look-ups."""
     if search_filter.custom_fields and search_filter.custom_fields_combiner:
         filters.append({"filter": search_filter.custom_fields, search_filter.custom_fields_combiner: True})
 
+    return filters
+
+async def iter_search_candidates(search_filter: CandidateSearchFilter, max_results: int) -> AsyncIterator[dict]:
+    """
+    Stream candidates matching the filter, starting at its offset, deduplicated by id.
+    The first page tells the total, the remaining pages are then fetched concurrently a few at a time
+    and yielded in order, so at most RECRUITEE_MAX_CONCURRENCY pages are held in memory.
+    """
+    filters_json = json.dumps(_build_search_filters(search_filter))
+
+    async def fetch_page(offset: int) -> dict:
+        params = {"limit": _AUTO_PAGE_SIZE, "offset": offset, "filters_json": filters_json}
+        return await _get("/search/new/candidates", params=params)
+
+    start = search_filter.offset
+    page = await fetch_page(start)
+    total = page.get("total")
+    end = start + max_results if total is None else min(total, start + max_results)
+    # Without a total we can't plan ahead, so pages are fetched one after another until a short one
+    window = RECRUITEE_MAX_CONCURRENCY if total is not None else 1
+    offsets = iter(range(start + _AUTO_PAGE_SIZE, end, _AUTO_PAGE_SIZE))
+    pending: deque[asyncio.Task] = deque()
+    seen: set[int] = set()
+
+    try:
+        while True:
+            hits = page.get("hits", [])
+            if total is not None or len(hits) == _AUTO_PAGE_SIZE:
+                with upstream_priority(PRIORITY_BULK):
+                    while len(pending) < window and (offset := next(offsets, None)) is not None:
+                        pending.append(asyncio.ensure_future(fetch_page(offset)))
+
+            for c in hits:
+                if c["id"] in seen:
+                    continue
+                seen.add(c["id"])
+                yield {"id": c["id"], "name": c["name"], "emails": c["emails"]}
+                if len(seen) >= max_results:
+                    return
+
+            if not pending:
+                return
+            page = await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+@mcp.tool()
+async def search_candidates(
+    search_filter: CandidateSearchFilter, format: ResultFormat = "records", max_bytes: MaxBytes = None, cursor: Cursor = None
+) -> list[dict] | dict:
+    """Return basic data for candidates who match a multi-field filter.
+Helper tools convert human-readable names to IDs using cached look-ups.
+Set 'auto_paginate' to get every match (up to 'max_results') in one call instead of paging with 'offset'."""
+
+    # The cursor continues within the same page or auto-paginated range, so it shifts the upstream offset
+    start = decode_cursor(cursor)
+    search_filter = search_filter.model_copy(update={
+        "offset": search_filter.offset + start,
+        "limit": max(0, search_filter.limit - start),
+        "max_results": max(0, search_filter.max_results - start),
+    })
+
+    if search_filter.auto_paginate:
+        candidates = []
+        has_more = False
+        if search_filter.max_results:
+            size = 0
+            # Closed on the early exit, which cancels the pages still being fetched
+            async with aclosing(iter_search_candidates(search_filter, search_filter.max_results)) as results:
+                async for c in results:
+                    candidates.append(c)
+                    size += len(encode(c))
+                    # Enough to fill the budget, the rest is left to the next cursor
+                    if max_bytes is not None and size > max_bytes:
+                        # Only the stream knows whether another match follows (dedup, last page, total)
+                        has_more = await anext(results, None) is not None
+                        break
+        return shape_result(candidates, format, max_bytes, start, has_more)
+
+    if not search_filter.limit:
+        return shape_result([], format, max_bytes, start)
+
     params = {
         "limit": search_filter.limit,
         "offset": search_filter.offset,
-        "filters_json": json.dumps(filters),
+        "filters_json": json.dumps(_build_search_filters(search_filter)),
     }
 
     data = await _get("/search/new/candidates", params=params)
-    return [{"id": c["id"], "name": c["name"], "emails": c["emails"]} for c in data.get("hits", [])]
+    candidates = [{"id": c["id"], "name": c["name"], "emails": c["emails"]} for c in data.get("hits", [])]
+    return shape_result(candidates, format, max_bytes, start)
 
 @mcp.tool()
 async def search_candidate_by_query(query: str, search_name: bool = False, limit: int = 100, offset: int = 0) -> list[dict]:
     """Search candidates using a full-text query across name, email, and other fields.
-If `search_name` is False, only return candidates whose name exactly matches the query."""
+If `search_name` is True, only return candidates whose name exactly matches the query."""
 
     if not query:
         return []
     if limit > 10_000:
         raise ValueError("Recruitee caps limit at 10 000 per call.")
 
+    if mirror is not None:
+        hits = await mirror.search(query, search_name, limit, offset)
+        if hits is not None:
+            return hits
+
     filters = [{"field": "all", "query": query}]
     params = {
         "limit": limit,
@@ -133,11 +240,15 @@ async def _get_candidates_details(candidate_ids: list[int], fields: list[str]) -
     if not candidate_ids:
         return []
 
-    details = []
-    for candidate_id in candidate_ids:
+    async def fetch(candidate_id: int) -> dict:
         data = await _get(f"/candidates/{candidate_id}")
-        candidate_data = data.get("candidate", {})
-        if not fields:
+        return data.get("candidate", {})
+
+    details = []
+    for candidate_id, candidate_data in zip(candidate_ids, await gather_limited(candidate_ids, fetch)):
+        if isinstance(candidate_data, Exception):
+            details.append({"id": candidate_id, "error": error_message(candidate_data)})
+        elif not fields:
             details.append(candidate_data)
         else:
             filtered_data = {field: candidate_data.get(field) for field in fields if field in candidate_data}
@@ -146,11 +257,27 @@ async def _get_candidates_details(candidate_ids: list[int], fields: list[str]) -
     return details
 
 @mcp.tool()
-async def get_candidates_details(candidate_ids: list[int], fields: list[str]) -> list[dict]:
-    """Return specific fields or full available candidates data by their IDs.
-If fields are empty, return all fields. Find available fields using 'list_candidate_fields'."""
-    details = await _get_candidates_details(candidate_ids, fields)
-    return details
+async def get_candidates_details(
+    candidate_ids: list[int], fields: list[str], format: ResultFormat = "records", max_bytes: MaxBytes = None, cursor: Cursor = None
+) -> list[dict] | dict:
+    """Return specific fields or full available candidates data by their IDs, in the requested order.
+If fields are empty, return all fields. Find available fields using 'list_candidate_fields'.
+Candidates that can't be fetched are returned as {"id": ..., "error": ...}."""
+    start = decode_cursor(cursor)
+    candidate_ids = candidate_ids[start:]
+    if max_bytes is None:
+        details = await _get_candidates_details(candidate_ids, fields)
+    else:
+        # A batch at a time, stopping once the budget is filled
+        details = []
+        size = 0
+        for i in range(0, len(candidate_ids), RECRUITEE_MAX_CONCURRENCY):
+            batch = await _get_candidates_details(candidate_ids[i:i + RECRUITEE_MAX_CONCURRENCY], fields)
+            details.extend(batch)
+            size += sum(len(encode(d)) for d in batch)
+            if size > max_bytes:
+                break
+    return shape_result(details, format, max_bytes, start, has_more=len(details) < len(candidate_ids))
 
 @mcp.tool()
 async def list_candidate_fields() -> list[str]:
@@ -161,18 +288,95 @@ async def list_candidate_fields() -> list[str]:
     if len(data) == 0:
         return []
     example_id = data[0]["id"]
-    candidate_details = await _get_candidates_details([example_id], [])
-    return list(candidate_details[0].keys())
+    candidate_details = await _get(f"/candidates/{example_id}")
+    return list(candidate_details.get("candidate", {}).keys())
+
+
+async def _fetch_all_notes(candidate_id: int) -> list[dict]:
+    """Every note of a candidate, page after page until a short one."""
+    notes = _notes_cache.get(str(candidate_id))
+    if notes is not TTLCache.MISSING:
+        return notes
+    notes = []
+    while True:
+        params = {"limit": _NOTES_PAGE_SIZE, "offset": len(notes)}
+        data = await _get(f"/candidates/{candidate_id}/notes", params=params)
+        page = data.get("notes", [])
+        notes.extend(page)
+        if len(page) < _NOTES_PAGE_SIZE:
+            break
+    _notes_cache.set(str(candidate_id), notes, ttl=_NOTES_TTL)
+    return notes
+
+
+def _filter_notes(notes: list[dict], created_from: Optional[int], created_to: Optional[int]) -> list[dict]:
+    if created_from is None and created_to is None:
+        return notes
+    filtered = []
+    for note in notes:
+        created_at = iso_to_unix(note["created_at"]) if note.get("created_at") else None
+        if created_at is None:
+            continue
+        if created_from is not None and created_at < created_from:
+            continue
+        if created_to is not None and created_at > created_to:
+            continue
+        filtered.append(note)
+    return filtered
+
+
+async def _get_candidates_notes(candidate_ids: list[int], created_from: Optional[int], created_to: Optional[int]) -> list[dict]:
+    results = []
+    for candidate_id, notes in zip(candidate_ids, await gather_limited(candidate_ids, _fetch_all_notes)):
+        if isinstance(notes, Exception):
+            results.append({"id": candidate_id, "error": error_message(notes)})
+        else:
+            results.append({"id": candidate_id, "notes": _filter_notes(notes, created_from, created_to)})
+    return results
 
 
 @mcp.tool()
 async def get_candidate_notes(candidate_id: int, limit: int = 100, offset: int = 0) -> list[dict]:
     """Fetch plain-text notes attached to a candidate profile."""
+    notes = _notes_cache.get(str(candidate_id))
+    if notes is not TTLCache.MISSING:
+        return notes[offset:offset + limit]
     params = {"limit": limit, "offset": offset}
     data = await _get(f"/candidates/{candidate_id}/notes", params=params)
     return data.get("notes", [])
 
 
+@mcp.tool()
+async def get_candidates_notes(
+    candidate_ids: list[int],
+    created_from: Optional[str] = None,
+    created_to: Optional[str] = None,
+    format: ResultFormat = "records",
+    max_bytes: MaxBytes = None,
+    cursor: Cursor = None,
+) -> list[dict] | dict:
+    """Return every note of many candidates in one call, as {"id": ..., "notes": [...]} in the requested order.
+'created_from' and 'created_to' (ISO 8601 formatted date strings) keep only the notes created in that period.
+Candidates whose notes can't be fetched are returned as {"id": ..., "error": ...}."""
+    created_from = iso_to_unix(created_from) if created_from else None
+    created_to = iso_to_unix(created_to) if created_to else None
+    start = decode_cursor(cursor)
+    candidate_ids = candidate_ids[start:]
+    if max_bytes is None:
+        results = await _get_candidates_notes(candidate_ids, created_from, created_to)
+    else:
+        # A batch at a time, stopping once the budget is filled
+        results = []
+        size = 0
+        for i in range(0, len(candidate_ids), RECRUITEE_MAX_CONCURRENCY):
+            batch = await _get_candidates_notes(candidate_ids[i:i + RECRUITEE_MAX_CONCURRENCY], created_from, created_to)
+            results.extend(batch)
+            size += sum(len(encode(r)) for r in batch)
+            if size > max_bytes:
+                break
+    return shape_result(results, format, max_bytes, start, has_more=len(results) < len(candidate_ids))
+
+
 if __name__ == "__main__":
     import asyncio
 
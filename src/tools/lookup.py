@@ -1,13 +1,12 @@
 from typing import Literal
 
-from async_lru import alru_cache
-
 from src.utils.server_config import mcp
+from src.utils.cache import lookup_cache
 from src.tools.utils import _get
 
 
 
-@alru_cache(ttl=900)
+@lookup_cache(ttl=900)
 async def _fetch_talent_pools() -> list[dict]:
     data = await _get("/talent_pools")
     return data.get("talent_pools", [])
@@ -42,7 +41,7 @@ async def get_talent_pool_details(talent_pool_id: int) -> dict:
     return data.get("talent_pool", {})
 
 
-@alru_cache(ttl=900)
+@lookup_cache(ttl=900)
 async def _fetch_disqualify_reasons() -> list[dict]:
     data = await _get("/disqualify_reasons")
     return data.get("disqualify_reasons", [])
@@ -53,7 +52,7 @@ async def list_disqualify_reasons() -> list[dict]:
     return [{"id": d["id"], "name": d["name"]} for d in await _fetch_disqualify_reasons()]
 
 
-@alru_cache(ttl=900)
+@lookup_cache(ttl=900)
 async def _fetch_tags() -> list[dict]:
     data = await _get("/tags")
     return data.get("tags", [])
@@ -64,7 +63,7 @@ async def list_tags() -> list[dict]:
     return [{"id": t["id"], "name": t["name"], "count": t["taggings_count"]} for t in await _fetch_tags()]
 
 
-@alru_cache(ttl=900)
+@lookup_cache(ttl=900)
 async def _fetch_custom_fields() -> list[dict]:
     data = await _get("/custom_fields/fields/searchable")
     return data.get("fields", [])
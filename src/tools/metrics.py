@@ -1,15 +1,19 @@
-from typing import Optional, Literal
-from datetime import datetime
+from typing import Annotated, Optional, Literal, Union
+from datetime import date, datetime
+import json
+import sys
+import time
 
-from async_lru import alru_cache
 from pydantic import BaseModel, Field, field_validator
 
-from src.utils.server_config import mcp
-from src.tools.utils import _get
+from src.utils.server_config import mcp, METRICS_CACHE_SIZE
+from src.utils.cache import lookup_cache, TTLCache
+from src.utils.store import shared_store
+from src.tools.utils import _get, gather_limited, error_message
 
 
 
-@alru_cache(ttl=900)
+@lookup_cache(ttl=900)
 async def _fetch_metrics() -> list[dict]:
     """Fetch metrics data from Recruitee API with caching."""
     data = await _get("/report/metrics")
@@ -112,55 +116,163 @@ class TimeBasedMetricQueryParams(MetricQueryParams):
     include_deleted_candidates: Optional[bool] = Field(None, description="Include results for deleted candidates.")
 
 
-@mcp.tool()
-async def get_single_metric_data(mqp: SingleMetricQueryParams) -> dict:
-    """Fetch data for a single metric based on the provided query parameters, e.g., `fill_rate`. Must match the metric kind"""
+# Report results are cached by query, for longer the less likely the period is to still change
+_report_cache = TTLCache(maxsize=METRICS_CACHE_SIZE, name="metric_reports")
+
+_REPORT_TTL_DEFAULT = 300
+_REPORT_TTL = {
+    "today": 60,
+    "all_time": 900,
+    "yesterday": 6 * 3600,
+    "last_week": 6 * 3600,
+    "last_month": 6 * 3600,
+    "last_quarter": 6 * 3600,
+    "last_year": 6 * 3600,
+}
+
+
+def _report_ttl(mqp: MetricQueryParams) -> int:
+    if mqp.date_range == "range" and mqp.date_end and date.fromisoformat(mqp.date_end[:10]) < date.today():
+        return 6 * 3600
+    return _REPORT_TTL.get(mqp.date_range, _REPORT_TTL_DEFAULT)
+
+
+def _report_cache_key(report: str, params: dict) -> str:
+    params = dict(params)
+    if params.get("filters"):
+        # 'job:5;department:10' and 'department:10; job:5' are the same query
+        params["filters"] = ";".join(sorted(f.strip() for f in params["filters"].split(";") if f.strip()))
+    # Relative ranges ('yesterday', 'last_month', ...) mean another period once the day changes
+    return json.dumps([report, params, date.today().isoformat()], sort_keys=True)
+
+
+def report_cache_stats() -> dict[str, int]:
+    """Hit/miss counters of the metric report cache."""
+    return _report_cache.stats()
+
+
+async def _fetch_report(report: str, mqp: MetricQueryParams) -> dict:
     params = mqp.model_dump(exclude_none=True, exclude_defaults=False)
-    data = await _get(f"/report/single_metric", params=params)
-    return {
+    key = _report_cache_key(report, params)
+    result = _report_cache.get(key)
+    if result is not TTLCache.MISSING:
+        return result
+
+    # Another worker may have fetched the same report
+    stored = None
+    if shared_store is not None:
+        try:
+            stored = await shared_store.get(f"report:{key}")
+        except Exception as e:
+            print(f"Warning: could not read a metric report from the shared store: {e}", file=sys.stderr)
+    if stored is not None:
+        _report_cache.set(key, stored["result"], ttl=stored["expires_at"] - time.time())
+        return stored["result"]
+
+    data = await _get(f"/report/{report}", params=params)
+    result = {
         "results": data.get("results", {}),
         "meta": data.get("meta", {})
     }
+    ttl = _report_ttl(mqp)
+    _report_cache.set(key, result, ttl=ttl)
+    if shared_store is not None:
+        try:
+            await shared_store.set(f"report:{key}", {"result": result, "expires_at": time.time() + ttl}, ttl=ttl)
+        except Exception as e:
+            print(f"Warning: could not write a metric report to the shared store: {e}", file=sys.stderr)
+    return result
+
+
+@mcp.tool()
+async def get_single_metric_data(mqp: SingleMetricQueryParams) -> dict:
+    """Fetch data for a single metric based on the provided query parameters, e.g., `fill_rate`. Must match the metric kind"""
+    return await _fetch_report("single_metric", mqp)
 
 @mcp.tool()
 async def get_trend_metric_data(mqp: TrendMetricQueryParams) -> dict:
     """Fetch trend data for a metric based on the provided query parameters, e.g., `disqualifications_over_time`. Must match the metric kind"""
-    params = mqp.model_dump(exclude_none=True, exclude_defaults=False)
-    data = await _get(f"/report/trend", params=params)
-    return {
-        "results": data.get("results", {}),
-        "meta": data.get("meta", {})
-    }
+    return await _fetch_report("trend", mqp)
 
 @mcp.tool()
 async def get_breakdown_metric_data(mqp: BreakdownMetricQueryParams) -> dict:
     """Fetch breakdown data for a metric based on the provided query parameters, e.g., `jobs`. Must match the metric kind"""
-    params = mqp.model_dump(exclude_none=True, exclude_defaults=False)
-    data = await _get(f"/report/breakdown", params=params)
-    return {
-        "results": data.get("results", {}),
-        "meta": data.get("meta", {})
-    }
+    return await _fetch_report("breakdown", mqp)
 
 @mcp.tool()
 async def get_funnel_metric_data(mqp: FunnelMetricQueryParams) -> dict:
     """Fetch funnel data for a metric based on the provided query parameters, e.g., `dropoff_rate`. Must match the metric kind"""
-    params = mqp.model_dump(exclude_none=True, exclude_defaults=False)
-    data = await _get(f"/report/funnel", params=params)
-    return {
-        "results": data.get("results", {}),
-        "meta": data.get("meta", {})
-    }
+    return await _fetch_report("funnel", mqp)
 
 @mcp.tool()
 async def get_time_based_metric_data(mqp: TimeBasedMetricQueryParams) -> dict:
     """Fetch data for `custom_time_based` metric on the provided query parameters."""
-    params = mqp.model_dump(exclude_none=True, exclude_defaults=False)
-    data = await _get(f"/report/time_based", params=params)
-    return {
-        "results": data.get("results", {}),
-        "meta": data.get("meta", {})
+    return await _fetch_report("time_based", mqp)
+
+
+
+class SingleMetricBatchQuery(BaseModel):
+    id: str = Field(description="Caller-chosen id, the result is returned under it.")
+    kind: Literal["single"] = Field(description="Query kind, same as 'get_single_metric_data'.")
+    mqp: SingleMetricQueryParams
+
+class TrendMetricBatchQuery(BaseModel):
+    id: str = Field(description="Caller-chosen id, the result is returned under it.")
+    kind: Literal["trend"] = Field(description="Query kind, same as 'get_trend_metric_data'.")
+    mqp: TrendMetricQueryParams
+
+class BreakdownMetricBatchQuery(BaseModel):
+    id: str = Field(description="Caller-chosen id, the result is returned under it.")
+    kind: Literal["breakdown"] = Field(description="Query kind, same as 'get_breakdown_metric_data'.")
+    mqp: BreakdownMetricQueryParams
+
+class FunnelMetricBatchQuery(BaseModel):
+    id: str = Field(description="Caller-chosen id, the result is returned under it.")
+    kind: Literal["funnel"] = Field(description="Query kind, same as 'get_funnel_metric_data'.")
+    mqp: FunnelMetricQueryParams
+
+class TimeBasedMetricBatchQuery(BaseModel):
+    id: str = Field(description="Caller-chosen id, the result is returned under it.")
+    kind: Literal["time_based"] = Field(description="Query kind, same as 'get_time_based_metric_data'.")
+    mqp: TimeBasedMetricQueryParams
+
+MetricBatchQuery = Annotated[
+    Union[SingleMetricBatchQuery, TrendMetricBatchQuery, BreakdownMetricBatchQuery, FunnelMetricBatchQuery, TimeBasedMetricBatchQuery],
+    Field(discriminator="kind"),
+]
+
+_BATCH_REPORTS = {
+    "single": "single_metric",
+    "trend": "trend",
+    "breakdown": "breakdown",
+    "funnel": "funnel",
+    "time_based": "time_based",
+}
+
+
+@mcp.tool()
+async def get_metrics_batch(queries: list[MetricBatchQuery]) -> dict[str, dict]:
+    """Fetch data for many metric queries of any kind in one call, e.g. all numbers of a recruitment report.
+Returns {query id: {"results", "meta"}}; a query that fails is returned as {query id: {"error": ...}}."""
+    ids = [q.id for q in queries]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Query ids must be unique.")
+
+    # Identical queries under different ids are fetched once
+    unique: dict[str, tuple[str, MetricQueryParams]] = {}
+    query_keys = {}
+    for q in queries:
+        report = _BATCH_REPORTS[q.kind]
+        key = _report_cache_key(report, q.mqp.model_dump(exclude_none=True, exclude_defaults=False))
+        unique.setdefault(key, (report, q.mqp))
+        query_keys[q.id] = key
+
+    results = await gather_limited(unique.values(), lambda query: _fetch_report(*query))
+    by_key = {
+        key: {"error": error_message(result)} if isinstance(result, Exception) else result
+        for key, result in zip(unique, results)
     }
+    return {query_id: by_key[key] for query_id, key in query_keys.items()}
 
 
 if __name__ == "__main__":
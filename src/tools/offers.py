@@ -1,19 +1,128 @@
-from async_lru import alru_cache
+import asyncio
+import functools
+from typing import Optional
 
 from src.utils.server_config import mcp
-from src.tools.utils import _get
+from src.utils.cache import lookup_cache, TTLCache
+from src.utils.encoding import ResultFormat, MaxBytes, Cursor, decode_cursor, shape_result
+from src.tools.utils import _get, gather_limited, error_message
 
 
 
-@alru_cache(ttl=900)
+@lookup_cache(ttl=900)
 async def _fetch_offers() -> list[dict]:
     data = await _get("/offers")
     return data.get("offers", [])
 
 @mcp.tool()
-async def list_offers() -> list[dict]:
+async def list_offers(format: ResultFormat = "records", max_bytes: MaxBytes = None, cursor: Cursor = None) -> list[dict] | dict:
     """Return all job offers (ID + title)."""
-    return [{"id": o["id"], "title": o["title"], "status": o["status"], "priority": o["priority"]} for o in await _fetch_offers()]
+    start = decode_cursor(cursor)
+    offers = [{"id": o["id"], "title": o["title"], "status": o["status"], "priority": o["priority"]} for o in await _fetch_offers()]
+    return shape_result(offers[start:], format, max_bytes, start)
+
+# Offer details by offer id, shared by the detail and stage tools
+_offer_cache = TTLCache(maxsize=256, name="offer_details")
+_OFFER_TTL = 300
+# Pipeline stages by pipeline template id, most offers share a few templates
+_stages_cache = TTLCache(maxsize=256, name="pipeline_stages")
+# Pipeline template id by offer id, learned from offer details. Templates are rarely reassigned, so
+# this outlives the stages themselves
+_offer_templates = TTLCache(maxsize=4096, name="offer_pipeline_templates")
+_STAGES_TTL = 900
+_OFFER_TEMPLATES_TTL = 3600
+# Stages of every template seen in offer details so far, for resolving stage names without Recruitee
+_known_templates: dict[int, list[dict]] = {}
+_known_stages: list[dict] = []
+# Running fetches of a template's stages, so offers sharing it wait on a single request
+_stages_fetches: dict[int, asyncio.Task] = {}
+
+
+def _template_id(offer: dict) -> Optional[int]:
+    """Pipeline template of an offer, from its details or from its /offers row when it carries it."""
+    return offer.get("pipeline_template_id") or (offer.get("pipeline_template") or {}).get("id")
+
+
+def _stages(offer: dict) -> list[dict]:
+    return [
+        {"id": s["id"], "name": s["name"], "category": s["category"], "group": s["group"]}
+        for s in (offer.get("pipeline_template") or {}).get("stages", [])
+    ]
+
+
+async def _fetch_offer(offer_id: int) -> dict:
+    offer = _offer_cache.get(str(offer_id))
+    if offer is not TTLCache.MISSING:
+        return offer
+    data = await _get(f"/offers/{offer_id}")
+    offer = data.get("offer", {})
+    _offer_cache.set(str(offer_id), offer, ttl=_OFFER_TTL)
+    template_id = _template_id(offer)
+    if template_id is not None:
+        stages = _stages(offer)
+        _offer_templates.set(str(offer_id), template_id, ttl=_OFFER_TEMPLATES_TTL)
+        _stages_cache.set(str(template_id), stages, ttl=_STAGES_TTL)
+        _learn_template(template_id, stages)
+    return offer
+
+
+def _learn_template(template_id: int, stages: list[dict]) -> None:
+    global _known_stages
+    if _known_templates.get(template_id) == stages:
+        return
+    _known_templates[template_id] = stages
+    # A new list rather than an update, so resolve_entities sees the change and re-indexes
+    known = {}
+    for known_template_id, template_stages in _known_templates.items():
+        for stage in template_stages:
+            known.setdefault(stage["id"], {**stage, "pipeline_template_id": known_template_id})
+    _known_stages = list(known.values())
+
+
+async def _fetch_offer_stages(offer_id: int, template_id: Optional[int] = None) -> list[dict]:
+    """Stages of an offer, from the template cache when its template is known, `template_id` if given."""
+    if template_id is None:
+        template_id = _offer_templates.get(str(offer_id))
+    if template_id is None or template_id is TTLCache.MISSING:
+        return _stages(await _fetch_offer(offer_id))
+
+    stages = _stages_cache.get(str(template_id))
+    if stages is not TTLCache.MISSING:
+        return stages
+    task = _stages_fetches.get(template_id)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_offer(offer_id))
+        _stages_fetches[template_id] = task
+        task.add_done_callback(functools.partial(_stages_fetch_done, template_id))
+    # Any offer of the template has the same stages
+    return _stages(await asyncio.shield(task))
+
+
+def _stages_fetch_done(template_id: int, task: asyncio.Task) -> None:
+    if _stages_fetches.get(template_id) is task:
+        del _stages_fetches[template_id]
+
+
+async def _fetch_offers_stages(offer_ids: Optional[list[int]] = None) -> dict[int, list[dict] | dict]:
+    offers = await _fetch_offers()
+    listed = {o["id"]: _template_id(o) for o in offers}
+    if offer_ids is None:
+        offer_ids = list(listed)
+    offer_ids = list(dict.fromkeys(offer_ids))
+    results = await gather_limited(offer_ids, lambda offer_id: _fetch_offer_stages(offer_id, listed.get(offer_id)))
+    return {
+        offer_id: {"error": error_message(stages)} if isinstance(stages, Exception) else stages
+        for offer_id, stages in zip(offer_ids, results)
+    }
+
+
+async def _fetch_pipeline_stages() -> list[dict]:
+    """
+    Stages of every pipeline template seen in the offers fetched so far, each one once. Never calls
+    Recruitee: learning all templates would take a request per offer.
+    """
+    return _known_stages
+
 
 async def _get_offers_details(offer_ids: list[int], fields: list[str]) -> dict[int, dict]:
     """Helper function to get offer details with optional field filtering."""
@@ -21,10 +130,10 @@ async def _get_offers_details(offer_ids: list[int], fields: list[str]) -> dict[i
         return []
 
     details = {}
-    for offer_id in offer_ids:
-        data = await _get(f"/offers/{offer_id}")
-        offer_data = data.get("offer", {})
-        if not fields:
+    for offer_id, offer_data in zip(offer_ids, await gather_limited(offer_ids, _fetch_offer)):
+        if isinstance(offer_data, Exception):
+            details[offer_id] = {"error": error_message(offer_data)}
+        elif not fields:
             details[offer_id] = offer_data
         else:
             filtered_data = {field: offer_data.get(field, "Field doesn't exist") for field in fields}
@@ -35,7 +144,8 @@ async def _get_offers_details(offer_ids: list[int], fields: list[str]) -> dict[i
 @mcp.tool()
 async def get_offers_details(offer_ids: list[int], fields: list[str]) -> dict[int, dict]:
     """Return specific fields or full available offer data by their IDs.
-If fields are empty, return all fields. Find available fields using 'list_offer_fields'."""
+If fields are empty, return all fields. Find available fields using 'list_offer_fields'.
+Offers that can't be fetched are returned as {"error": ...}."""
     details = await _get_offers_details(offer_ids, fields)
     return details
 
@@ -50,14 +160,15 @@ async def list_offer_fields() -> list[str]:
 @mcp.tool()
 async def get_offer_stages(offer_id: int) -> list[dict]:
     """Return all pipeline stages for the given offer (ID + name + category + group)."""
-    data = await _get(f"/offers/{offer_id}")
-    data = data.get("offer", {}).get("pipeline_template", {}).get("stages", [])
-    return [
-        {"id": s["id"], "name": s["name"], "category": s["category"], "group": s["group"]}
-        for s in data
-    ]
+    listed = {o["id"]: _template_id(o) for o in await _fetch_offers()}
+    return await _fetch_offer_stages(offer_id, listed.get(offer_id))
+
+@mcp.tool()
+async def get_offers_stages(offer_ids: Optional[list[int]] = None) -> dict[int, list[dict] | dict]:
+    """Return the pipeline stages (ID + name + category + group) of many offers at once, or of every offer if 'offer_ids' is empty.
+Offers that can't be fetched are returned as {"error": ...}."""
+    return await _fetch_offers_stages(offer_ids or None)
 
 if __name__ == "__main__":
-    import asyncio
     x = asyncio.run(get_offers_details([2218442, 2216242], ["created_at", "deleted_at"]))
     print(f"{x}\n{len(x)}")
\ No newline at end of file
@@ -0,0 +1,68 @@
+import asyncio
+import functools
+import sys
+from typing import Literal, Optional
+
+from src.utils.server_config import mcp
+from src.utils.cache import LookupCache
+from src.utils.entity_index import EntityIndex
+from src.tools.utils import error_message
+from src.tools import lookup, offers
+
+
+
+EntityKind = Literal["offer", "tag", "talent_pool", "disqualify_reason", "stage"]
+
+# Lookup backing every kind, and how its rows become (id, name, extra fields returned with matches)
+_SOURCES = {
+    "offer": (offers._fetch_offers, lambda o: (o["id"], o["title"], {"status": o.get("status")})),
+    "tag": (lookup._fetch_tags, lambda t: (t["id"], t["name"], {})),
+    "talent_pool": (lookup._fetch_talent_pools, lambda tp: (tp["id"], tp["title"], {"status": tp.get("status")})),
+    "disqualify_reason": (lookup._fetch_disqualify_reasons, lambda d: (d["id"], d["name"], {})),
+    "stage": (offers._fetch_pipeline_stages, lambda s: (s["id"], s["name"], {"category": s["category"], "pipeline_template_id": s["pipeline_template_id"]})),
+}
+
+# Searched when the caller doesn't pick kinds. Stages only cover offers whose stages were already fetched
+_DEFAULT_KINDS = ["offer", "tag", "talent_pool", "disqualify_reason"]
+
+_index = EntityIndex()
+# Rows each kind was last indexed from, so unchanged cached lists aren't diffed again
+_indexed: dict[str, list] = {}
+
+
+def _reindex(kind: str, rows: list[dict]) -> None:
+    if _indexed.get(kind) is rows:
+        return
+    _, to_entity = _SOURCES[kind]
+    _index.update(kind, (to_entity(row) for row in rows))
+    _indexed[kind] = rows
+
+
+# Re-indexed whenever a lookup refreshes (warm-up, refresh-ahead, another worker), not on the call path
+for _kind, (_fetch, _) in _SOURCES.items():
+    if isinstance(_fetch, LookupCache):
+        _fetch.on_refresh(functools.partial(_reindex, _kind))
+
+
+@mcp.tool()
+async def resolve_entities(names: list[str], kinds: Optional[list[EntityKind]] = None, limit: int = 3) -> dict[str, list[dict]]:
+    """Resolve many human-readable names to IDs in one call: offers, tags, talent pools and disqualify reasons by default.
+Matching tolerates typos, accents and partial names. Up to 'limit' matches per name, best first, with a score from 0 to 1.
+Use it instead of listing offers, tags and talent pools before 'search_candidates'.
+Kind 'stage' is only searched when asked for, and only knows the pipeline stages of offers already looked up (e.g. with 'get_offer_stages')."""
+    kinds = list(dict.fromkeys(kinds or _DEFAULT_KINDS))
+    # Cached lookups, so this only waits on Recruitee before the warm-up is done
+    results = await asyncio.gather(*(_SOURCES[kind][0]() for kind in kinds), return_exceptions=True)
+    failed = {}
+    for kind, rows in zip(kinds, results):
+        if isinstance(rows, Exception):
+            failed[kind] = error_message(rows)
+        else:
+            _reindex(kind, rows)
+    if len(failed) == len(kinds):
+        raise ValueError(f"Could not load any lookup: {failed}")
+    if failed:
+        print(f"Warning: resolve_entities without {failed}", file=sys.stderr)
+
+    searched = [kind for kind in kinds if kind not in failed]
+    return {name: _index.search(name, kinds=searched, limit=limit) for name in dict.fromkeys(names)}
@@ -1,28 +1,359 @@
-from datetime import datetime
-import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import random
+import sys
+import time
 import httpx
 
-import markdown
 
-from src.utils.server_config import mcp, RECRUITEE_COMPANY_ID, RECRUITEE_API_TOKEN, BASE_DEPLOY_URL
+from src.utils.server_config import (
+    mcp,
+    RECRUITEE_COMPANY_ID,
+    RECRUITEE_API_TOKEN,
+    RECRUITEE_API_URL,
+    RECRUITEE_MAX_CONNECTIONS,
+    RECRUITEE_MAX_KEEPALIVE_CONNECTIONS,
+    RECRUITEE_KEEPALIVE_EXPIRY,
+    RECRUITEE_HTTP2,
+    RECRUITEE_MAX_CONCURRENCY,
+    RECRUITEE_RATE_LIMIT,
+    RECRUITEE_RATE_BURST,
+    RECRUITEE_MAX_RETRIES,
+    SERVER_WORKERS,
+    BASE_DEPLOY_URL,
+    RENDER_WORKERS,
+)
+from src.utils.documents import touch_document, write_document
+from src.utils.telemetry import collector, span, track_upstream
 
 
 
-_API = f"https://api.recruitee.com/c/{RECRUITEE_COMPANY_ID}"
+_API = f"{RECRUITEE_API_URL}/c/{RECRUITEE_COMPANY_ID}"
 _HEADERS = {"Authorization": f"Bearer {RECRUITEE_API_TOKEN}"}
 _TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+_LIMITS = httpx.Limits(
+    max_connections=RECRUITEE_MAX_CONNECTIONS,
+    max_keepalive_connections=RECRUITEE_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=RECRUITEE_KEEPALIVE_EXPIRY,
+)
 
+# Process-wide client shared by every session, managed by `open_http_client` / `close_http_client`
+_client: httpx.AsyncClient | None = None
+
+
+def _create_client() -> httpx.AsyncClient:
+    http2 = RECRUITEE_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("Warning: RECRUITEE_HTTP2 is set but the 'h2' package is not installed, falling back to HTTP/1.1", file=sys.stderr)
+            http2 = False
+    return httpx.AsyncClient(headers=_HEADERS, timeout=_TIMEOUT, limits=_LIMITS, http2=http2)
+
+
+async def open_http_client() -> None:
+    """Create the pooled upstream client. Called once on server startup."""
+    global _client
+    if _client is None:
+        _client = _create_client()
+
+
+async def close_http_client() -> None:
+    """Close the pooled upstream client and its keep-alive connections. Called on server shutdown."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+
+
+# Upstream priorities, lower is served first. Fan-outs and background jobs run as bulk work
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+_priority: ContextVar[int] = ContextVar("upstream_priority", default=PRIORITY_INTERACTIVE)
+
+_BACKOFF_BASE = 0.5
+_BACKOFF_MAX = 30.0
+_RETRY_AFTER_MAX = 60.0
+
+
+@contextmanager
+def upstream_priority(priority: int):
+    """Run upstream calls made inside the block (and tasks started from it) at the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _TokenBucket:
+    """
+    Request budget of one Recruitee company: `rate` requests per second with bursts of up to `burst`.
+    Callers that have to wait are released by priority first, then in arrival order.
+    A 429 pauses the whole bucket for its Retry-After so other callers don't hit the same wall.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    def _refill(self, now: float) -> None:
+        # `updated` lies in the future while paused, nothing accrues until the pause is over
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    async def acquire(self, priority: int, flight: "_Flight | None" = None) -> None:
+        """Wait for a token. A coalesced `flight` can move the wait up while it lasts, see `_Flight.join`."""
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        if flight is not None:
+            flight.queued = (self, waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Released just before the cancellation arrived, hand the token back
+                self.tokens = min(self.burst, self.tokens + 1)
+            raise
+        finally:
+            if flight is not None:
+                flight.queued = None
+
+    def requeue(self, waiter: asyncio.Future, priority: int) -> None:
+        """Queue a waiting caller again at a better priority. Its old place is skipped once it's released."""
+        if not waiter.done():
+            heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+            self._dispatch()
+
+    def pause(self, seconds: float) -> None:
+        self.tokens = 0.0
+        self.updated = max(self.updated, time.monotonic() + seconds)
+
+    def _dispatch(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters and self.tokens >= 1:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                continue
+            self.tokens -= 1
+            waiter.set_result(None)
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+        if self._waiters:
+            delay = max(self.updated, now) + (1 - self.tokens) / self.rate - now
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+_buckets: dict[str, _TokenBucket] = {}
+
+
+def _bucket(company_id: str) -> _TokenBucket:
+    if company_id not in _buckets:
+        # Each worker process gets its share of the budget
+        _buckets[company_id] = _TokenBucket(RECRUITEE_RATE_LIMIT / SERVER_WORKERS, max(1, RECRUITEE_RATE_BURST // SERVER_WORKERS))
+    return _buckets[company_id]
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** attempt))
+
+
+def _retry_after(resp: httpx.Response) -> float | None:
+    """Seconds to wait according to the Retry-After header (delay-seconds or HTTP-date), if any."""
+    value = resp.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), _RETRY_AFTER_MAX)
+
+
+async def _request(client: httpx.AsyncClient, path: str, params: dict | None, flight: "_Flight | None" = None) -> dict:
+    bucket = _bucket(RECRUITEE_COMPANY_ID)
+    for attempt in range(RECRUITEE_MAX_RETRIES + 1):
+        last_attempt = attempt == RECRUITEE_MAX_RETRIES
+        with span("rate_limit_wait"):
+            await bucket.acquire(flight.priority if flight is not None else _priority.get(), flight)
+        try:
+            with track_upstream(path) as tracked, span("http", attempt=attempt) as http:
+                resp = await client.get(f"{_API}{path}", params=params)
+                tracked["status"] = http.attributes["status"] = resp.status_code
+                tracked["bytes"] = http.attributes["bytes"] = len(resp.content)
+        except httpx.TransportError:
+            # Timeouts, refused or dropped connections
+            if last_attempt:
+                raise
+            await asyncio.sleep(_backoff(attempt))
+            continue
+
+        if (resp.status_code == 429 or resp.status_code >= 500) and not last_attempt:
+            delay = _retry_after(resp)
+            if resp.status_code == 429:
+                delay = delay if delay is not None else _backoff(attempt)
+                bucket.pause(delay)
+            await asyncio.sleep(delay if delay is not None else _backoff(attempt))
+            continue
 
-async def _get(path: str, params: dict | None = None) -> dict:
-    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
         try:
-            resp = await client.get(f"{_API}{path}", headers=_HEADERS, params=params)
             resp.raise_for_status()
-            return resp.json()
+            with span("decode"):
+                return resp.json()
         except httpx.HTTPStatusError as e:
             raise ValueError(f"Recruitee API failed: {e.response.status_code}, {e.response.text}")
 
 
+class _Flight:
+    """
+    One upstream GET shared by identical concurrent `_get` calls. The task copies the context, and so
+    the priority, of the caller that started it; the flight runs at the best priority among all its
+    callers instead, so an interactive call joining a bulk one isn't served as bulk work.
+    """
+
+    def __init__(self, priority: int):
+        self.priority = priority
+        # (bucket, waiter) while waiting for a rate limit token
+        self.queued: tuple[_TokenBucket, asyncio.Future] | None = None
+        self.task: asyncio.Task | None = None
+
+    def join(self, priority: int) -> None:
+        if priority < self.priority:
+            self.priority = priority
+            if self.queued is not None:
+                bucket, waiter = self.queued
+                bucket.requeue(waiter, priority)
+
+
+# Identical GETs in flight share one upstream call, keyed by (path, normalized params)
+_inflight: dict[tuple[str, str], _Flight] = {}
+_coalescing_stats = {"requests": 0, "upstream_calls": 0, "coalesced": 0}
+
+
+def _request_key(path: str, params: dict | None) -> tuple[str, str]:
+    return path, json.dumps(params or {}, sort_keys=True, default=str)
+
+
+def coalescing_stats() -> dict[str, int]:
+    """Counters of `_get` calls, the upstream calls actually made, and calls saved by coalescing."""
+    return dict(_coalescing_stats)
+
+
+@collector
+def _coalescing_metrics():
+    yield "recruitee_get_calls_total", "counter", "Recruitee GETs asked for by tools, before coalescing.", [({}, _coalescing_stats["requests"])]
+    yield "recruitee_get_coalesced_total", "counter", "Recruitee GETs answered by an identical call already in flight.", [({}, _coalescing_stats["coalesced"])]
+
+
+async def _fetch(path: str, params: dict | None, flight: _Flight | None = None) -> dict:
+    if _client is None:
+        # No server lifespan (e.g. running a tool module directly), use a short-lived client
+        async with _create_client() as client:
+            return await _request(client, path, params, flight)
+    return await _request(_client, path, params, flight)
+
+
+def _forget_inflight(key: tuple[str, str], flight: _Flight, task: asyncio.Task) -> None:
+    if _inflight.get(key) is flight:
+        del _inflight[key]
+    if not task.cancelled():
+        # Mark the exception as retrieved in case every caller was cancelled meanwhile
+        task.exception()
+
+
+async def _get(path: str, params: dict | None = None) -> dict:
+    """
+    GET a Recruitee API path and return the decoded JSON.
+    Concurrent identical calls share the same response object, so callers must not mutate it.
+    """
+    _coalescing_stats["requests"] += 1
+    key = _request_key(path, params)
+    flight = _inflight.get(key)
+    with span("get", path=path, coalesced=flight is not None):
+        if flight is not None:
+            _coalescing_stats["coalesced"] += 1
+            flight.join(_priority.get())
+        else:
+            _coalescing_stats["upstream_calls"] += 1
+            flight = _Flight(_priority.get())
+            # Started inside the span, so the requests it makes show under it
+            flight.task = asyncio.ensure_future(_fetch(path, params, flight))
+            _inflight[key] = flight
+            flight.task.add_done_callback(lambda done: _forget_inflight(key, flight, done))
+        # Shielded so one cancelled caller doesn't cancel the call for everybody else
+        return await asyncio.shield(flight.task)
+
+
+T = TypeVar("T")
+
+
+async def gather_limited(
+    items: Iterable[T],
+    fetch: Callable[[T], Awaitable[Any]],
+    limit: int | None = None,
+) -> list[Any]:
+    """
+    Run `fetch` for every item with at most `limit` calls in flight (default: RECRUITEE_MAX_CONCURRENCY).
+    Results keep the order of `items`. An item that fails gets its exception in place of a result,
+    so one bad id (e.g. a 404) doesn't fail the whole batch.
+    """
+    items = list(items)
+    results: list[Any] = [None] * len(items)
+    pending = iter(enumerate(items))
+
+    async def worker():
+        for index, item in pending:
+            try:
+                results[index] = await fetch(item)
+            except Exception as e:
+                results[index] = e
+
+    workers = min(limit or RECRUITEE_MAX_CONCURRENCY, len(items))
+    # Fan-outs are bulk work, single interactive calls get ahead of them in the rate budget
+    with upstream_priority(PRIORITY_BULK):
+        await asyncio.gather(*(worker() for _ in range(workers)))
+    return results
+
+
+def error_message(error: Exception) -> str:
+    """Short description of a per-item failure returned by `gather_limited`."""
+    return str(error) or type(error).__name__
+
+
 def iso_to_unix(iso_string: str) -> int:
     """
     Converts an ISO 8601 formatted date string to a Unix timestamp (seconds since epoch).
@@ -38,21 +369,11 @@ def iso_to_unix(iso_string: str) -> int:
         raise ValueError(f"Invalid ISO date string: {iso_string}") from e
 
 
-@mcp.tool()
-async def markdown_to_url(markdown_str: str) -> str:
-    """Convert Markdown text to HTML, save it to the documents directory, and return URL to access it."""
-    if not markdown_str:
-        return ""
-    if not BASE_DEPLOY_URL:
-        raise ValueError("BASE_URL environment variable must be set to generate document URLs")
-    
-    try:
-        html = markdown.markdown(
-            markdown_str,
-            extensions=["extra", "codehilite"]
-        )
-        
-        full_html = f"""<!DOCTYPE html>
+# Worker threads rendering and writing reports for markdown_to_url
+_render_pool = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="report-render")
+
+# Report page, `{html}` is the rendered Markdown
+_REPORT_TEMPLATE = """<!DOCTYPE html>
         <html>
         <head>
             <meta charset="UTF-8">
@@ -134,15 +455,38 @@ async def markdown_to_url(markdown_str: str) -> str:
         </body>
         </html>"""
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"report_{timestamp}.html"
-        documents_dir = os.getenv("DOCUMENTS_DIR") or "./data"
-        os.makedirs(documents_dir, exist_ok=True)
-        file_path = os.path.join(documents_dir, filename)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(full_html)
+
+def _publish_report(markdown_str: str) -> str:
+    """Render a report and write it to the documents directory. Runs in the render pool."""
+    # Named by content, so publishing the same report again neither renders nor writes anything
+    digest = hashlib.sha256((_REPORT_TEMPLATE + markdown_str).encode("utf-8")).hexdigest()
+    filename = f"report_{digest[:16]}.html"
+    if touch_document(filename):
+        return filename
+
+    # Imported on first use, it only matters to markdown_to_url
+    import markdown
+
+    html = markdown.markdown(
+        markdown_str,
+        extensions=["extra", "codehilite"]
+    )
+    write_document(filename, _REPORT_TEMPLATE.format(html=html).encode("utf-8"))
+    return filename
+
+
+@mcp.tool()
+async def markdown_to_url(markdown_str: str) -> str:
+    """Convert Markdown text to HTML, save it to the documents directory, and return URL to access it."""
+    if not markdown_str:
+        return ""
+    if not BASE_DEPLOY_URL:
+        raise ValueError("BASE_URL environment variable must be set to generate document URLs")
+    
+    try:
+        # Rendering (codehilite) and file writes are slow for big reports, keep them off the event loop
+        filename = await asyncio.get_running_loop().run_in_executor(_render_pool, _publish_report, markdown_str)
         return f"{BASE_DEPLOY_URL}/documents/{filename}"
         
     except Exception as e:
         raise ValueError(f"Error converting Markdown to HTML file: {e}") from e
-
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from src.utils.server_config import mcp
+from src.utils.telemetry import render
+from src.utils.profiling import folded, sample_stacks
+
+
+
+# Longest profile one request may ask for, in seconds
+_PROFILE_MAX_SECONDS = 60
+_profiling = asyncio.Lock()
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus metrics of this process: tools, Recruitee API calls and caches."""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+async def traces_endpoint(request: Request) -> Response:
+    """
+    Span trees of the latest tool calls, newest first.
+    Query parameters: `tool` (only this tool), `min_ms` (only calls at least this slow), `limit` (default 20).
+    """
+    try:
+        min_ms = float(request.query_params.get("min_ms", 0))
+        limit = int(request.query_params.get("limit", 20))
+    except ValueError:
+        return JSONResponse({"error": "min_ms and limit must be numbers"}, status_code=400)
+    return JSONResponse(mcp.traces(request.query_params.get("tool"), min_ms, limit))
+
+
+async def profile_endpoint(request: Request) -> Response:
+    """
+    Sample the event loop thread of this process for `seconds` (default 10, max 60) every `interval`
+    seconds (default 0.01) and return the stacks in the folded flame graph format. One at a time.
+    """
+    try:
+        seconds = float(request.query_params.get("seconds", 10))
+        interval = float(request.query_params.get("interval", 0.01))
+    except ValueError:
+        return JSONResponse({"error": "seconds and interval must be numbers"}, status_code=400)
+    if not 0 < seconds <= _PROFILE_MAX_SECONDS or not 0.001 <= interval <= 1:
+        return JSONResponse({"error": f"seconds must be in (0, {_PROFILE_MAX_SECONDS}] and interval in [0.001, 1]"}, status_code=400)
+    if _profiling.locked():
+        return JSONResponse({"error": "A profile is already running"}, status_code=409)
+
+    async with _profiling:
+        # Sampled from a worker thread while the loop keeps serving requests
+        stacks, samples = await asyncio.to_thread(sample_stacks, threading.get_ident(), seconds, interval)
+    return PlainTextResponse(folded(stacks), headers={"X-Profile-Samples": str(samples)})
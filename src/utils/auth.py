@@ -1,21 +1,89 @@
+import asyncio
+import hmac
 import os
 import re
+import sqlite3
+import sys
+import time
 from html import escape
 from typing import Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
-
-from fastapi import Request, status
-from fastapi.responses import JSONResponse, HTMLResponse
-
-from starlette.responses import RedirectResponse
+from starlette import status
+from starlette.datastructures import Headers
+from starlette.requests import Request, cookie_parser
+from starlette.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from limits import parse
+from limits.storage import Storage
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from src.utils.store import limits_storage_uri, _connect, _sqlite_path, _SCHEMA
+
+
+
+class SQLiteLimitsStorage(Storage):
+    """
+    Fixed-window counters for `limits` (and so the slowapi limiter) in the SQLiteStore file.
+    Defining the subclass registers it for `sqlite://` storage URIs.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = _sqlite_path(uri)
+        with _connect(self.path) as conn:
+            conn.executescript(_SCHEMA)
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with _connect(self.path) as conn:
+            return conn.execute(
+                "INSERT INTO limits (key, count, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET"
+                " count = CASE WHEN limits.expires_at <= ? THEN excluded.count ELSE limits.count + excluded.count END,"
+                " expires_at = CASE WHEN limits.expires_at <= ? THEN excluded.expires_at ELSE limits.expires_at END"
+                " RETURNING count",
+                (key, amount, now + expiry, now, now),
+            ).fetchone()[0]
+
+    def get(self, key: str) -> int:
+        with _connect(self.path) as conn:
+            row = conn.execute("SELECT count FROM limits WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        return 0 if row is None else row[0]
+
+    def get_expiry(self, key: str) -> float:
+        with _connect(self.path) as conn:
+            row = conn.execute("SELECT expires_at FROM limits WHERE key = ?", (key,)).fetchone()
+        return time.time() if row is None else row[0]
 
+    def check(self) -> bool:
+        try:
+            with _connect(self.path) as conn:
+                conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
 
-limiter = Limiter(key_func=get_remote_address)
+    def reset(self) -> int:
+        with _connect(self.path) as conn:
+            return conn.execute("DELETE FROM limits").rowcount
+
+    def clear(self, key: str) -> None:
+        with _connect(self.path) as conn:
+            conn.execute("DELETE FROM limits WHERE key = ?", (key,))
+
+
+# Counters live in the shared store, so limits hold across workers
+limiter = Limiter(key_func=get_remote_address, storage_uri=limits_storage_uri)
+# Login attempts per IP address on the documents login form
+_LOGIN_RATE_LIMIT = parse("3/minute")
 
 
 class InputValidator:
@@ -61,70 +129,78 @@ class InputValidator:
         return True, ""
 
 
-class BearerAuthMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, protected_paths=None):
-        super().__init__(app)
-        self.protected_paths = protected_paths or ["/mcp"]
-    
-    async def dispatch(self, request: Request, call_next):
+class BearerAuthMiddleware:
+    """
+    Bearer token auth for the MCP endpoint. Plain ASGI rather than `BaseHTTPMiddleware`, so the
+    long-lived streamed responses of `/mcp` go straight through without an extra task per request.
+    """
+
+    def __init__(self, app: ASGIApp, protected_paths=None):
+        self.app = app
+        self.protected_paths = tuple(protected_paths or ["/mcp"])
+        # Read once at startup, not per request
+        self.expected = (os.getenv("MCP_BEARER_TOKEN") or "").encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Only apply Bearer auth to specific paths (like /mcp)
-        path_requires_bearer = any(request.url.path.startswith(path) for path in self.protected_paths)
-        
-        if not path_requires_bearer:
-            return await call_next(request)
-        
-        expected = os.getenv("MCP_BEARER_TOKEN")
-        if not expected:
+        if scope["type"] != "http" or not scope["path"].startswith(self.protected_paths):
+            return await self.app(scope, receive, send)
+
+        response = self._check(Headers(scope=scope).get("authorization"))
+        if response is not None:
+            return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+    def _check(self, header: Optional[str]) -> Optional[Response]:
+        if not self.expected:
             return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"detail": "Server misconfiguration - MCP_BEARER_TOKEN not set"})
-        
-        header = request.headers.get("authorization")
+
         if not header or not header.startswith("Bearer "):
             return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Missing authorization header"})
-        
+
         token = header.split(" ")[1] if len(header.split(" ")) > 1 else ""
-        if token != expected:
+        if not hmac.compare_digest(token.encode(), self.expected):
             return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Unauthorized"})
-        
-        return await call_next(request)
+        return None
 
 
-class LoginPasswordMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, protected_paths=None):
-        super().__init__(app)
-        self.protected_paths = protected_paths or ["/documents"]
-    
-    async def dispatch(self, request: Request, call_next):
+class LoginPasswordMiddleware:
+    """Login form and auth cookie in front of `/documents`, plain ASGI like `BearerAuthMiddleware`."""
+
+    def __init__(self, app: ASGIApp, protected_paths=None):
+        self.app = app
+        self.protected_paths = tuple(protected_paths or ["/documents"])
+        # Read once at startup, not per request
+        self.auth_token_secret = os.getenv("DOCUMENTS_TOKEN")
+        self.docs_username = os.getenv("DOCUMENTS_USERNAME")
+        self.docs_password = os.getenv("DOCUMENTS_PASSWORD")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Only apply login/password auth to documents paths
-        path_requires_login = any(request.url.path.startswith(path) for path in self.protected_paths)
-        
-        if not path_requires_login:
-            return await call_next(request)
-        
-        auth_token_secret = os.getenv("DOCUMENTS_TOKEN")
-        docs_username = os.getenv("DOCUMENTS_USERNAME")
-        docs_password = os.getenv("DOCUMENTS_PASSWORD")
-        
-        if not auth_token_secret:
+        if scope["type"] != "http" or not scope["path"].startswith(self.protected_paths):
+            return await self.app(scope, receive, send)
+
+        response = await self._dispatch(scope, receive)
+        if response is not None:
+            return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+    async def _dispatch(self, scope: Scope, receive: Receive) -> Optional[Response]:
+        """Return the response to send instead of the protected app, or None to let the request through."""
+        if not self.auth_token_secret:
             return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"detail": "Server misconfiguration - DOCUMENTS_TOKEN not set"})
-        if not docs_username or not docs_password:
+        if not self.docs_username or not self.docs_password:
             return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"detail": "Server misconfiguration - DOCUMENTS_USERNAME or DOCUMENTS_PASSWORD not set"})
-        
-        auth_token = request.cookies.get("auth_token")
-        if auth_token and self._verify_token(auth_token, auth_token_secret):
-            return await call_next(request)
-        
-        if request.method == "POST":
-            # Rate limiting: 3 login attempts per minute per IP address
-            try:
-                from limits import parse
-                rate_limit = parse("3/minute")
-                client_ip = get_remote_address(request)
-                if not limiter._limiter.test(rate_limit, client_ip):
-                    return self._show_login_form(error="Too many login attempts. Please try again later.")
-                limiter._limiter.hit(rate_limit, client_ip)
-            except Exception:
-                pass
-            
+
+        auth_token = cookie_parser(Headers(scope=scope).get("cookie", "")).get("auth_token")
+        if auth_token and self._verify_token(auth_token, self.auth_token_secret):
+            return None
+
+        if scope["method"] == "POST":
+            request = Request(scope, receive)
+            if not await self._allow_login_attempt(get_remote_address(request)):
+                return self._show_login_form(error="Too many login attempts. Please try again later.")
+
             is_secure = request.url.scheme == "https"
             form = await request.form()
             
@@ -143,11 +219,13 @@ class LoginPasswordMiddleware(BaseHTTPMiddleware):
                 return self._show_login_form(error=f"Invalid input: {password_error}")
             
             # Check credentials (use raw password for comparison to avoid issues with escaping)
-            if username == docs_username and raw_password == docs_password:
+            username_ok = hmac.compare_digest(username.encode(), self.docs_username.encode())
+            password_ok = hmac.compare_digest(str(raw_password).encode(), self.docs_password.encode())
+            if username_ok and password_ok:
                 response = RedirectResponse(url=str(request.url), status_code=302)
                 response.set_cookie(
                     "auth_token", 
-                    auth_token_secret,
+                    self.auth_token_secret,
                     max_age=3600*24*7,
                     httponly=True,
                     secure=is_secure,
@@ -159,9 +237,22 @@ class LoginPasswordMiddleware(BaseHTTPMiddleware):
                 return self._show_login_form(error="Invalid username or password")
         return self._show_login_form()
 
+    @staticmethod
+    async def _allow_login_attempt(client_ip: str) -> bool:
+        """
+        Count a login attempt against `_LOGIN_RATE_LIMIT` for the IP address. The counter storage
+        (SQLite or Redis) is synchronous, so it runs in a worker thread, off the event loop. When the
+        storage fails the attempt is refused: failing open would lift the limit on password guessing.
+        """
+        try:
+            return await asyncio.to_thread(limiter.limiter.hit, _LOGIN_RATE_LIMIT, client_ip)
+        except Exception as e:
+            print(f"Warning: login rate limit check failed, refusing the attempt: {e}", file=sys.stderr)
+            return False
+
     @staticmethod
     def _verify_token(token: str, expected_secret: str) -> bool:
-        return token == expected_secret
+        return hmac.compare_digest(token.encode(), expected_secret.encode())
 
     @staticmethod
     def _show_login_form(error: str = None):
@@ -0,0 +1,246 @@
+import asyncio
+import functools
+import json
+import random
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from src.utils.server_config import LOOKUP_CACHE_MAX_STALE
+from src.utils.store import shared_store
+from src.utils.telemetry import collector
+
+
+
+# How often `refresh_forever` looks for entries due for a refresh, in seconds
+_REFRESH_CHECK_INTERVAL = 30
+
+
+class LookupCache:
+    """
+    Stale-while-revalidate cache around an async fetch function.
+
+    Entries younger than `ttl` are served as is. Older entries, up to `max_stale` seconds past `ttl`,
+    are served immediately while a single background refresh runs. Anything older is fetched inline.
+    Concurrent misses for the same key share one fetch. With a shared store (SHARED_STORE_URL), entries
+    are also kept there, so a freshly started process or another worker can serve them without
+    waiting on Recruitee.
+
+    Every instance is registered for `warm_up` and `refresh_forever`, which fetch entries ahead of
+    their expiry so callers normally never wait.
+    """
+
+    def __init__(self, fn: Callable[..., Awaitable[Any]], ttl: float, max_stale: float):
+        self.fn = fn
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.name = f"{fn.__module__}.{fn.__qualname__}"
+        # Jittered per process, so with several workers one refreshes first and the others copy its result
+        self.refresh_after = ttl * random.uniform(0.75, 0.9)
+        self._entries: dict[str, tuple[Any, float]] = {}
+        self._fetches: dict[str, asyncio.Task] = {}
+        self._calls: dict[str, tuple[tuple, dict]] = {}
+        self._listeners: list[Callable[[Any], None]] = []
+        self._stats = {"hits": 0, "stale": 0, "misses": 0}
+        functools.update_wrapper(self, fn)
+        _caches.append(self)
+
+    def _key(self, args: tuple, kwargs: dict) -> str:
+        return json.dumps([self.name, args, sorted(kwargs.items())], default=str)
+
+    async def __call__(self, *args, **kwargs) -> Any:
+        key = self._key(args, kwargs)
+        self._calls[key] = (args, kwargs)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = await self._load(key)
+            if entry is not None:
+                self._set_entry(key, entry)
+
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                self._stats["hits"] += 1
+                return value
+            if age < self.ttl + self.max_stale:
+                self._stats["stale"] += 1
+                self._fetch(key, args, kwargs)
+                return value
+
+        self._stats["misses"] += 1
+        return await asyncio.shield(self._fetch(key, args, kwargs))
+
+    async def _load(self, key: str) -> tuple[Any, float] | None:
+        """The entry kept in the shared store, if any."""
+        if shared_store is None:
+            return None
+        try:
+            stored = await shared_store.get(key)
+        except Exception as e:
+            print(f"Warning: could not read {self.name} from the shared store: {e}", file=sys.stderr)
+            return None
+        if stored is None:
+            return None
+        return stored["value"], stored["fetched_at"]
+
+    def _fetch(self, key: str, args: tuple, kwargs: dict) -> asyncio.Task:
+        """Start (or join) the fetch for `key`, storing the result in both tiers."""
+        task = self._fetches.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key, args, kwargs))
+            self._fetches[key] = task
+            task.add_done_callback(functools.partial(self._fetch_done, key))
+        return task
+
+    async def _fetch_and_store(self, key: str, args: tuple, kwargs: dict) -> Any:
+        # Another worker may have refreshed the entry already
+        local = self._entries.get(key)
+        stored = await self._load(key)
+        if stored is not None and time.time() - stored[1] < self.ttl and (local is None or stored[1] > local[1]):
+            self._set_entry(key, stored)
+            return stored[0]
+
+        value = await self.fn(*args, **kwargs)
+        fetched_at = time.time()
+        self._set_entry(key, (value, fetched_at))
+        if shared_store is not None:
+            try:
+                await shared_store.set(key, {"value": value, "fetched_at": fetched_at}, ttl=self.ttl + self.max_stale)
+            except Exception as e:
+                print(f"Warning: could not write {self.name} to the shared store: {e}", file=sys.stderr)
+        return value
+
+    def _set_entry(self, key: str, entry: tuple[Any, float]) -> None:
+        self._entries[key] = entry
+        for listener in self._listeners:
+            try:
+                listener(entry[0])
+            except Exception as e:
+                print(f"Warning: refresh listener of {self.name} failed: {e}", file=sys.stderr)
+
+    def on_refresh(self, listener: Callable[[Any], None]) -> None:
+        """Call `listener` with every new value, e.g. to rebuild an index derived from it."""
+        self._listeners.append(listener)
+
+    def _fetch_done(self, key: str, task: asyncio.Task) -> None:
+        if self._fetches.get(key) is task:
+            del self._fetches[key]
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None and key in self._entries:
+            # A failed background refresh keeps serving the stale entry
+            print(f"Warning: refreshing {self.name} failed: {error}", file=sys.stderr)
+
+    async def refresh(self) -> None:
+        """Fetch every key called so far again, or the call without arguments if there was none yet."""
+        calls = dict(self._calls) or {self._key((), {}): ((), {})}
+        self._calls.update(calls)
+        await asyncio.gather(*(self._fetch(key, args, kwargs) for key, (args, kwargs) in calls.items()))
+
+    def refresh_due(self) -> None:
+        """Start a background fetch for the entries past `refresh_after`, before they expire."""
+        now = time.time()
+        for key, (args, kwargs) in list(self._calls.items()):
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] >= self.refresh_after:
+                self._fetch(key, args, kwargs)
+
+    def stats(self) -> dict[str, int]:
+        """Calls served fresh, served stale while refreshing, and waiting on a fetch, plus the number of entries."""
+        return {**self._stats, "size": len(self._entries)}
+
+    def cache_clear(self) -> None:
+        """Drop in-memory entries. The shared store is left untouched."""
+        self._entries.clear()
+
+
+_caches: list[LookupCache] = []
+
+
+async def warm_up() -> None:
+    """Fetch all lookups concurrently, so the first tool calls after startup don't wait on Recruitee."""
+    results = await asyncio.gather(*(cache.refresh() for cache in _caches), return_exceptions=True)
+    for cache, result in zip(_caches, results):
+        if isinstance(result, Exception):
+            print(f"Warning: warming up {cache.name} failed: {result}", file=sys.stderr)
+
+
+async def refresh_forever() -> None:
+    """Background job started with the server: warm up, then keep refreshing lookups ahead of their TTL."""
+    await warm_up()
+    while True:
+        await asyncio.sleep(_REFRESH_CHECK_INTERVAL)
+        for cache in _caches:
+            cache.refresh_due()
+
+
+def lookup_cache(ttl: float, max_stale: float = LOOKUP_CACHE_MAX_STALE):
+    """Decorator caching Recruitee lookup helpers such as `_fetch_offers`, see `LookupCache`."""
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> LookupCache:
+        return LookupCache(fn, ttl=ttl, max_stale=max_stale)
+    return decorator
+
+
+class TTLCache:
+    """
+    In-memory cache with a TTL per entry, bounded to `maxsize` entries with LRU eviction.
+    Its counters are exported on /metrics under `name`.
+    """
+
+    MISSING = object()
+
+    def __init__(self, maxsize: int, name: str):
+        self.maxsize = maxsize
+        self.name = name
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        _ttl_caches.append(self)
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or `TTLCache.MISSING` if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return self.MISSING
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[0]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def stats(self) -> dict[str, int]:
+        """Hit, miss and eviction counters plus the current number of entries."""
+        return {**self._stats, "size": len(self._entries)}
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_ttl_caches: list[TTLCache] = []
+
+
+@collector
+def _cache_metrics():
+    lookups = [(cache.name, cache.stats()) for cache in _caches]
+    others = [(cache.name, cache.stats()) for cache in _ttl_caches]
+    yield "recruitee_cache_requests_total", "counter", "Cache lookups by cache and result (hit, stale, miss).", [
+        ({"cache": name, "result": result}, stats[counter])
+        for name, stats in lookups + others
+        for counter, result in (("hits", "hit"), ("stale", "stale"), ("misses", "miss")) if counter in stats
+    ]
+    yield "recruitee_cache_evictions_total", "counter", "Entries evicted to stay within the cache size.", [
+        ({"cache": name}, stats["evictions"]) for name, stats in others
+    ]
+    yield "recruitee_cache_entries", "gauge", "Entries held in memory.", [
+        ({"cache": name}, stats["size"]) for name, stats in lookups + others
+    ]
@@ -0,0 +1,175 @@
+import asyncio
+import gzip
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from src.utils.server_config import (
+    DOCUMENTS_MAX_AGE_DAYS,
+    DOCUMENTS_MAX_BYTES,
+    DOCUMENTS_RETENTION_INTERVAL,
+    SERVER_WORKERS,
+)
+from src.utils.store import acquire_lease
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+
+# Pre-compressed siblings written next to every document, in order of preference
+_ENCODINGS = {"br": ".br", "gzip": ".gz"}
+# Documents named by content hash never change, so browsers may cache them for good
+_CONTENT_ADDRESSED = re.compile(r"^report_([0-9a-f]{16,})\.html$")
+# The index is rebuilt from disk once in a while, in case files were added or removed behind its back
+_RESCAN_INTERVAL = 24 * 3600
+
+
+def documents_dir() -> str:
+    """Directory served at /documents (Fly volume mount path in production)."""
+    path = os.getenv("DOCUMENTS_DIR") or "./data"
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _is_document(name: str) -> bool:
+    """Published documents are top-level HTML files, anything else in the directory is never served."""
+    return not os.path.dirname(name) and not name.startswith(".") and name.endswith(".html")
+
+
+class DocumentsIndex:
+    """
+    Size and modification time of every document (including its compressed siblings), so retention
+    passes don't have to rescan the volume. Built by one scan, then kept up to date on writes and evictions.
+    """
+
+    def __init__(self):
+        self._documents: dict[str, tuple[int, float]] | None = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+
+    def _scan(self) -> None:
+        documents: dict[str, tuple[int, float]] = {}
+        sizes: dict[str, int] = {}
+        with os.scandir(documents_dir()) as entries:
+            for entry in entries:
+                name = entry.name
+                for suffix in _ENCODINGS.values():
+                    if name.endswith(suffix):
+                        name = name[:-len(suffix)]
+                        break
+                # Other files on the volume (caches, the candidate mirror) are not ours to evict
+                if not _is_document(name) or not entry.is_file():
+                    continue
+                sizes[name] = sizes.get(name, 0) + entry.stat().st_size
+                if name == entry.name:
+                    documents[name] = (0, entry.stat().st_mtime)
+        self._documents = {name: (sizes[name], mtime) for name, (_, mtime) in documents.items()}
+        self._scanned_at = time.time()
+
+    def add(self, filename: str, size: int) -> None:
+        with self._lock:
+            if self._documents is not None:
+                self._documents[filename] = (size, time.time())
+
+    def touch(self, filename: str) -> None:
+        with self._lock:
+            if self._documents is not None and filename in self._documents:
+                self._documents[filename] = (self._documents[filename][0], time.time())
+
+    def evict(self, max_age: float, max_bytes: int, rescan: bool = False) -> list[str]:
+        """Delete documents older than `max_age` seconds, then the oldest ones until under `max_bytes`."""
+        with self._lock:
+            if rescan or self._documents is None or time.time() - self._scanned_at > _RESCAN_INTERVAL:
+                self._scan()
+
+            now = time.time()
+            by_age = sorted(self._documents.items(), key=lambda item: item[1][1])
+            total = sum(size for _, (size, _) in by_age)
+            evicted = []
+            for name, (size, mtime) in by_age:
+                if now - mtime <= max_age and total <= max_bytes:
+                    break
+                evicted.append(name)
+                total -= size
+
+            for name in evicted:
+                for path in [name, *(name + suffix for suffix in _ENCODINGS.values())]:
+                    try:
+                        os.remove(os.path.join(documents_dir(), path))
+                    except FileNotFoundError:
+                        pass
+                del self._documents[name]
+            return evicted
+
+
+_index = DocumentsIndex()
+
+
+def _write_atomic(path: str, content: bytes) -> None:
+    # Never let the static server see a half-written file. A temp file of its own per call, as the same
+    # report may be published by several threads or workers at once; hidden so it's never served or indexed.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_document(filename: str, content: bytes) -> bool:
+    """
+    Write a document plus pre-compressed `.gz` (and `.br` when brotli is installed) siblings.
+    Documents are content-addressed, so an existing file is left alone. Returns True if it was written.
+    """
+    path = os.path.join(documents_dir(), filename)
+    if os.path.exists(path):
+        return False
+    # Siblings first: once the document exists its compressed variants do too
+    size = len(content)
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    _write_atomic(f"{path}.gz", compressed)
+    size += len(compressed)
+    if brotli is not None:
+        compressed = brotli.compress(content, quality=9)
+        _write_atomic(f"{path}.br", compressed)
+        size += len(compressed)
+    _write_atomic(path, content)
+    _index.add(filename, size)
+    return True
+
+
+def touch_document(filename: str) -> bool:
+    """Mark an existing document as recently published, so retention keeps it. False if it doesn't exist."""
+    try:
+        os.utime(os.path.join(documents_dir(), filename))
+    except FileNotFoundError:
+        return False
+    _index.touch(filename)
+    return True
+
+
+async def retention_forever() -> None:
+    """Background job started with the server: evict old documents so the volume doesn't fill up."""
+    while True:
+        try:
+            # With several workers one of them evicts, rescanning as the others write documents too
+            if await acquire_lease("documents_retention", ttl=DOCUMENTS_RETENTION_INTERVAL * 2):
+                evicted = await asyncio.to_thread(
+                    _index.evict, DOCUMENTS_MAX_AGE_DAYS * 24 * 3600, DOCUMENTS_MAX_BYTES, SERVER_WORKERS > 1
+                )
+                if evicted:
+                    print(f"Evicted {len(evicted)} documents from {documents_dir()}", file=sys.stderr)
+        except Exception as e:
+            print(f"Warning: documents retention failed: {e}", file=sys.stderr)
+        await asyncio.sleep(DOCUMENTS_RETENTION_INTERVAL)
@@ -0,0 +1,67 @@
+import mimetypes
+import stat
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from src.utils.documents import _CONTENT_ADDRESSED, _ENCODINGS, _is_document
+
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class DocumentsStaticFiles(StaticFiles):
+    """
+    Static files for /documents. Only top-level HTML documents are served, pre-compressed variants are
+    picked by Accept-Encoding, and content-addressed reports get strong ETags and immutable caching.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        if not _is_document(path):
+            raise HTTPException(status_code=404)
+
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if not stat_result or not stat.S_ISREG(stat_result.st_mode):
+            raise HTTPException(status_code=404)
+
+        request_headers = Headers(scope=scope)
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        encoding = None
+        for candidate, suffix in _ENCODINGS.items():
+            if candidate in accepted:
+                variant_path, variant_stat = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if variant_stat and stat.S_ISREG(variant_stat.st_mode):
+                    full_path, stat_result, encoding = variant_path, variant_stat, candidate
+                    break
+
+        response = FileResponse(full_path, stat_result=stat_result, media_type=mimetypes.guess_type(path)[0])
+        response.headers["vary"] = "Accept-Encoding"
+        if encoding:
+            response.headers["content-encoding"] = encoding
+
+        content_addressed = _CONTENT_ADDRESSED.match(path)
+        if content_addressed:
+            digest = content_addressed.group(1)
+            response.headers["etag"] = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+            # private: documents sit behind the login form
+            response.headers["cache-control"] = "private, max-age=31536000, immutable"
+        else:
+            response.headers["cache-control"] = "private, no-cache"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
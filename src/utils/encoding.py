@@ -0,0 +1,109 @@
+import base64
+import json
+from typing import Annotated, Any, Literal, Optional
+
+import pydantic_core
+from pydantic import BaseModel, Field
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+
+# Tool parameters shared by the tools returning long lists
+ResultFormat = Annotated[
+    Literal["records", "columnar"],
+    Field(description="'records' is a list of objects. 'columnar' lists field names once in 'columns' and every result as an array in 'rows', much shorter for long lists."),
+]
+MaxBytes = Annotated[
+    Optional[int],
+    Field(description="Size budget of the result in bytes (about 4 bytes per token). Results past it are left out and 'next_cursor' continues after the last one returned."),
+]
+Cursor = Annotated[
+    Optional[str],
+    Field(description="'next_cursor' of a previous call with the same arguments, to continue where it stopped."),
+]
+
+# Room kept in the budget for the envelope around the results ({"columns": ..., "next_cursor": ...})
+_ENVELOPE_BYTES = 200
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+def encode(data: Any) -> bytes:
+    """Compact JSON, with orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers over 64 bits, which the fallback handles
+            pass
+    return pydantic_core.to_json(data, fallback=_default)
+
+
+def serialize_result(data: Any) -> str:
+    """FastMCP tool serializer. Without the default indentation, which only costs tokens."""
+    return encode(data).decode()
+
+
+def to_columnar(records: list[dict]) -> dict:
+    """Records as {"columns": [...], "rows": [[...], ...]}, columns in order of first appearance."""
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    return {"columns": columns, "rows": [[record.get(column) for column in columns] for record in records]}
+
+
+def encode_cursor(position: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"position": position}).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """Position in the full result list a cursor points at, 0 without one."""
+    if not cursor:
+        return 0
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))["position"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor, pass 'next_cursor' from a previous call unchanged.")
+    if not isinstance(position, int) or position < 0:
+        raise ValueError("Invalid cursor, pass 'next_cursor' from a previous call unchanged.")
+    return position
+
+
+def shape_result(
+    records: list[dict], format: str = "records", max_bytes: Optional[int] = None, start: int = 0, has_more: bool = False
+) -> list[dict] | dict:
+    """
+    Apply the output options of a tool to its results, `records` being the results from the cursor
+    position `start` on, and `has_more` telling whether the tool stopped collecting before the end.
+    Without options the records are returned as they are. Otherwise the result is {"items": [...]}
+    or the columnar form, plus "next_cursor" (null once everything was returned).
+    """
+    if format == "records" and max_bytes is None and start == 0:
+        return records
+
+    taken = records
+    next_cursor = None
+    if max_bytes is not None:
+        columns = to_columnar(records)["columns"] if format == "columnar" else None
+        budget = max_bytes - _ENVELOPE_BYTES - (len(encode(columns)) if columns else 0)
+        used = 0
+        count = 0
+        for record in records:
+            item = [record.get(column) for column in columns] if columns else record
+            used += len(encode(item)) + 1
+            # At least one result per call, or a cursor could never move on
+            if used > budget and count:
+                break
+            count += 1
+        if count < len(records) or has_more:
+            taken = records[:count]
+            next_cursor = encode_cursor(start + count)
+
+    body = to_columnar(taken) if format == "columnar" else {"items": taken}
+    return {**body, "next_cursor": next_cursor}
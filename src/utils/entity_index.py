@@ -0,0 +1,103 @@
+import heapq
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Hashable, Iterable
+
+
+
+def normalize(name: str) -> str:
+    """Case, accents and punctuation folded away: 'Próba  Senior-Dev' -> 'proba senior dev'."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    return " ".join(re.findall(r"\w+", folded))
+
+
+def trigrams(normalized: str) -> set[str]:
+    """Trigrams of every word, padded like pg_trgm so word starts weigh more than word middles."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class EntityIndex:
+    """
+    Trigram index over the names of lookup entities (offers, tags, talent pools, ...), for fuzzy
+    name -> id resolution. Entities are grouped by kind, and `update` re-indexes a kind by diffing
+    it against what is indexed, so a lookup refresh only touches the entities that changed.
+    """
+
+    def __init__(self):
+        # (kind, id) -> (name, normalized name, trigrams, extra fields returned with matches)
+        self._entities: dict[tuple[str, Hashable], tuple[str, str, set[str], dict]] = {}
+        self._postings: dict[str, set[tuple[str, Hashable]]] = {}
+        self._kinds: dict[str, set[tuple[str, Hashable]]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, kind: str, entities: Iterable[tuple[Hashable, str, dict]]) -> None:
+        """Make the `kind` entities exactly (id, name, extra fields) `entities`."""
+        with self._lock:
+            new = {(kind, id_): (name, extra) for id_, name, extra in entities if name}
+            old = self._kinds.get(kind, set())
+            for key in old - new.keys():
+                self._remove(key)
+            for key, (name, extra) in new.items():
+                current = self._entities.get(key)
+                if current is not None and current[0] == name:
+                    self._entities[key] = (*current[:3], extra)
+                    continue
+                if current is not None:
+                    self._remove(key)
+                normalized = normalize(name)
+                grams = trigrams(normalized)
+                self._entities[key] = (name, normalized, grams, extra)
+                for gram in grams:
+                    self._postings.setdefault(gram, set()).add(key)
+            self._kinds[kind] = set(new)
+
+    def _remove(self, key: tuple[str, Hashable]) -> None:
+        _, _, grams, _ = self._entities.pop(key)
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._postings[gram]
+
+    def search(self, query: str, kinds: Iterable[str] | None = None, limit: int = 3, min_score: float = 0.3) -> list[dict[str, Any]]:
+        """
+        Best matches for `query`, as {"kind", "id", "name", "score", **extra}. The score is 1 for an exact
+        (normalized) match, otherwise the trigram similarity, or 0.9 times the share of the query found
+        in the name when that is higher, so partial names ('backend') still find 'Senior Backend Engineer'.
+        """
+        normalized = normalize(query)
+        query_grams = trigrams(normalized)
+        if not query_grams:
+            return []
+        kinds = set(kinds) if kinds else None
+
+        with self._lock:
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self._postings.get(gram, ()))
+
+            scored = []
+            for key, count in shared.items():
+                if kinds is not None and key[0] not in kinds:
+                    continue
+                name, entity_normalized, grams, _ = self._entities[key]
+                if entity_normalized == normalized:
+                    score = 1.0
+                else:
+                    similarity = count / (len(query_grams) + len(grams) - count)
+                    score = max(similarity, 0.9 * count / len(query_grams))
+                if score >= min_score:
+                    scored.append((score, -len(name), key))
+
+            return [
+                {"kind": key[0], "id": key[1], "name": self._entities[key][0], "score": round(score, 3), **self._entities[key][3]}
+                for score, _, key in heapq.nlargest(limit, scored)
+            ]
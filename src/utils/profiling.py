@@ -0,0 +1,94 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+
+
+
+# What a cold start of each transport imports before it can answer the first request
+_STARTUP_SCRIPTS = {
+    "stdio": "import src.app",
+    "sse": "import src.app, uvicorn",
+    "streamable-http": "import src.app, uvicorn; src.app.create_http_app()",
+}
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_STDLIB_DIR = os.path.dirname(os.__file__)
+
+
+def profile_startup(transport: str, top: int = 20) -> None:
+    """
+    Print the import time breakdown of a cold start of `transport`: totals per top-level package and
+    the slowest modules. Imports run in a fresh interpreter with `-X importtime`, as on a new machine.
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _STARTUP_SCRIPTS[transport]],
+        capture_output=True,
+        text=True,
+        cwd=_PROJECT_DIR,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise SystemExit(f"Startup profiling failed:\n{result.stderr}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    total_us = sum(packages.values())
+
+    print(f"Startup imports for {transport}: {total_us / 1000:.0f} ms in {len(modules)} modules ({elapsed * 1000:.0f} ms wall time)\n")
+    print(f"{'package':<40}{'ms':>10}{'share':>8}")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<40}{self_us / 1000:>10.1f}{self_us / total_us:>8.0%}")
+
+    print(f"\n{'module':<60}{'self ms':>10}{'cumulative ms':>15}")
+    for name, self_us, cumulative_us, depth in sorted(modules, key=lambda module: -module[1])[:top]:
+        print(f"{name:<60}{self_us / 1000:>10.1f}{cumulative_us / 1000:>15.1f}")
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if path.startswith(_PROJECT_DIR):
+        path = os.path.relpath(path, _PROJECT_DIR)
+    elif "site-packages" in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    elif path.startswith(_STDLIB_DIR):
+        path = os.path.relpath(path, _STDLIB_DIR)
+    return f"{code.co_qualname} ({path}:{code.co_firstlineno})"
+
+
+def sample_stacks(thread_id: int, seconds: float, interval: float = 0.01) -> tuple[Counter, int]:
+    """
+    Sample the Python stack of thread `thread_id` every `interval` seconds for `seconds`, from the
+    calling thread. Returns how many times each stack was seen (root first, frames joined by ';')
+    and the number of samples. Meant for the event loop thread of the running server.
+    """
+    stacks = Counter()
+    samples = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:
+            break
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        stacks[";".join(reversed(labels))] += 1
+        samples += 1
+        time.sleep(interval)
+    return stacks, samples
+
+
+def folded(stacks: Counter) -> str:
+    """Stacks in the folded format read by flamegraph.pl, speedscope and most flame graph viewers."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -1,7 +1,8 @@
 import os
 
 from dotenv import load_dotenv, find_dotenv
-from fastmcp import FastMCP
+from src.utils.encoding import serialize_result
+from src.utils.telemetry import InstrumentedFastMCP
 
 
 
@@ -12,10 +13,51 @@ if find_dotenv() != "":
 
 RECRUITEE_COMPANY_ID = os.getenv("RECRUITEE_COMPANY_ID")
 RECRUITEE_API_TOKEN = os.getenv("RECRUITEE_API_TOKEN")
+RECRUITEE_API_URL = os.getenv("RECRUITEE_API_URL") or "https://api.recruitee.com"
 BASE_DEPLOY_URL = os.getenv("BASE_DEPLOY_URL")
+# Worker threads rendering markdown_to_url reports
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS") or 2)
+
+# Connection pool of the shared upstream HTTP client
+RECRUITEE_MAX_CONNECTIONS = int(os.getenv("RECRUITEE_MAX_CONNECTIONS") or 20)
+RECRUITEE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("RECRUITEE_MAX_KEEPALIVE_CONNECTIONS") or 10)
+RECRUITEE_KEEPALIVE_EXPIRY = float(os.getenv("RECRUITEE_KEEPALIVE_EXPIRY") or 30.0)
+RECRUITEE_HTTP2 = (os.getenv("RECRUITEE_HTTP2") or "").lower() in ("1", "true", "yes")
+# Max upstream requests in flight for a single batch tool call (e.g. get_candidates_details)
+RECRUITEE_MAX_CONCURRENCY = int(os.getenv("RECRUITEE_MAX_CONCURRENCY") or 8)
+# Upstream request budget per company (token bucket) and retries on 429 / 5xx / timeouts
+RECRUITEE_RATE_LIMIT = float(os.getenv("RECRUITEE_RATE_LIMIT") or 10.0)
+RECRUITEE_RATE_BURST = int(os.getenv("RECRUITEE_RATE_BURST") or 20)
+RECRUITEE_MAX_RETRIES = int(os.getenv("RECRUITEE_MAX_RETRIES") or 4)
+
+# Optional on-disk tier for lookup caches, and how long past their TTL entries may still be served
+LOOKUP_CACHE_PATH = os.getenv("LOOKUP_CACHE_PATH")
+LOOKUP_CACHE_MAX_STALE = float(os.getenv("LOOKUP_CACHE_MAX_STALE") or 24 * 3600)
+
+# Store shared by the workers of a --workers deployment (caches, rate limits), LOOKUP_CACHE_PATH is a SQLite one
+SHARED_STORE_URL = os.getenv("SHARED_STORE_URL") or (f"sqlite://{LOOKUP_CACHE_PATH}" if LOOKUP_CACHE_PATH else "memory://")
+# Number of server processes, set by --workers. Each one gets its share of the upstream rate limit
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS") or 1)
+
+# Max number of cached metric report results (get_*_metric_data)
+METRICS_CACHE_SIZE = int(os.getenv("METRICS_CACHE_SIZE") or 256)
+
+# Optional local candidate mirror answering search_candidate_by_query, and its sync period in seconds
+CANDIDATE_MIRROR_PATH = os.getenv("CANDIDATE_MIRROR_PATH")
+CANDIDATE_MIRROR_SYNC_INTERVAL = float(os.getenv("CANDIDATE_MIRROR_SYNC_INTERVAL") or 300)
+
+# Span trees of the latest tool calls kept in memory for /admin/traces
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE") or 200)
+
+# Retention of published documents: max age in days, max total size in bytes, seconds between passes
+DOCUMENTS_MAX_AGE_DAYS = float(os.getenv("DOCUMENTS_MAX_AGE_DAYS") or 90)
+DOCUMENTS_MAX_BYTES = int(os.getenv("DOCUMENTS_MAX_BYTES") or 800 * 1024 * 1024)
+DOCUMENTS_RETENTION_INTERVAL = float(os.getenv("DOCUMENTS_RETENTION_INTERVAL") or 3600)
 
 # Initialize the MCP server
-mcp = FastMCP(
+mcp = InstrumentedFastMCP(
     name="Recruitee Server",
     instructions=_INSTRUCTIONS,
-)
\ No newline at end of file
+    tool_serializer=serialize_result,
+    trace_buffer_size=TRACE_BUFFER_SIZE,
+)
@@ -0,0 +1,111 @@
+import itertools
+import re
+from datetime import datetime
+from typing import Any, Iterable
+
+import numpy as np
+
+
+
+DEFAULT_PERCENTILES = (50, 75, 90)
+
+# Digit group separators: '5 000', '5,000', '5.000', "5'000" (a comma or dot before anything but 3 digits is a decimal one)
+_GROUP_SEPARATOR = re.compile(r"(?<=\d)[.,\s\u00a0\u202f'](?=\d{3}(?!\d))")
+_NUMBER = re.compile(r"(\d+(?:[.,]\d+)?)\s*(k)?(?![a-z])")
+# What separates the two ends of a range: '4000-6000', '10 to 15k'
+_RANGE = re.compile(r"\s*(?:-|\u2013|\u2014|to|do)\s*")
+
+
+def check_percentiles(percentiles: Iterable[float] | None) -> tuple[float, ...]:
+    percentiles = tuple(percentiles) if percentiles else DEFAULT_PERCENTILES
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise ValueError("Percentiles must be between 0 and 100.")
+    return percentiles
+
+
+def timestamps(values: Iterable[str | None]) -> np.ndarray:
+    """ISO 8601 date strings as Unix timestamps in seconds, NaN where missing."""
+    # datetime64 would drop the UTC offsets, hence the parsing one by one
+    return np.array(
+        [datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() if value else np.nan for value in values],
+        dtype=float,
+    )
+
+
+def parse_number(text: str) -> float:
+    """
+    Number written in free text, NaN if there is none: '5 000 PLN' -> 5000, '5.000 PLN' -> 5000, '5,5k' -> 5500.
+    Ranges give their middle: '4000-6000' -> 5000, '10-15k' -> 12500.
+    """
+    cleaned = _GROUP_SEPARATOR.sub("", text.casefold())
+    matches = list(itertools.islice(_NUMBER.finditer(cleaned), 2))
+    numbers = [float(m[1].replace(",", ".")) * (1000 if m[2] else 1) for m in matches]
+    if (
+        len(matches) == 2 and not matches[0][2] and matches[1][2]
+        and _RANGE.fullmatch(cleaned, matches[0].end(), matches[1].start())
+        and numbers[0] * 1000 <= numbers[1]
+    ):
+        # The 'k' after a range covers both ends
+        numbers[0] *= 1000
+    return sum(numbers) / len(numbers) if numbers else np.nan
+
+
+def group_summaries(keys: np.ndarray, values: np.ndarray, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> dict[Any, dict]:
+    """
+    Count, mean, min, max and percentiles (linear interpolation, like np.percentile) of `values` for
+    every distinct key, NaN values left out. One sort over all groups, no Python loop per value.
+    """
+    keep = ~np.isnan(values)
+    keys, values = keys[keep], values[keep]
+    if not len(values):
+        return {}
+
+    groups, inverse = np.unique(keys, return_inverse=True)
+    order = np.lexsort((values, inverse))
+    ordered = values[order]
+    counts = np.bincount(inverse, minlength=len(groups))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    columns = {
+        "count": counts,
+        "mean": np.bincount(inverse, weights=values, minlength=len(groups)) / counts,
+        "min": ordered[starts],
+        "max": ordered[starts + counts - 1],
+    }
+    for p in percentiles:
+        position = starts + (counts - 1) * p / 100
+        lower = np.floor(position).astype(int)
+        upper = np.ceil(position).astype(int)
+        columns[f"p{p:g}"] = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+    return {
+        group.item(): {name: int(column[i]) if name == "count" else round(float(column[i]), 2) for name, column in columns.items()}
+        for i, group in enumerate(groups)
+    }
+
+
+def histogram(values: np.ndarray, bins: int = 10) -> list[dict]:
+    """Counts of the values in `bins` equal-width bins, NaN values left out."""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return []
+    counts, edges = np.histogram(values, bins=bins)
+    return [
+        {"from": round(float(edges[i]), 2), "to": round(float(edges[i + 1]), 2), "count": int(count)}
+        for i, count in enumerate(counts)
+    ]
+
+
+def value_counts(keys: np.ndarray, values: np.ndarray) -> dict[Any, dict[Any, int]]:
+    """Number of occurrences of every value per key, most frequent first."""
+    if not len(values):
+        return {}
+    pairs, counts = np.unique(np.stack([keys, values]), axis=1, return_counts=True)
+    result = {}
+    for i in np.argsort(-counts, kind="stable"):
+        result.setdefault(pairs[0, i].item(), {})[pairs[1, i].item()] = int(counts[i])
+    return result
+
+
+def summary(values: np.ndarray, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> dict | None:
+    """`group_summaries` of all values as a single group, None without any value."""
+    return group_summaries(np.zeros(len(values), dtype=int), values, percentiles).get(0)
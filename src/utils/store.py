@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+from typing import Any
+
+from src.utils.server_config import SHARED_STORE_URL
+
+
+
+# Owner of the leases taken by this process, see `acquire`
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS store (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS limits (key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL);
+"""
+
+
+def _sqlite_path(url: str) -> str:
+    """`sqlite:///data/cache/shared.sqlite3` is an absolute path, `sqlite://./shared.sqlite3` a relative one."""
+    return url.removeprefix("sqlite://")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    return sqlite3.connect(path, timeout=5.0)
+
+
+class SQLiteStore:
+    """
+    Key/value store in a local SQLite file. Shared by all workers of the machine, and kept across
+    restarts (e.g. a Fly machine auto-stop) when the file is on the volume.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.path = _sqlite_path(url)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _connect(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _get(self, key: str) -> Any:
+        with _connect(self.path) as conn:
+            row = conn.execute("SELECT value FROM store WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _set(self, key: str, value: Any, ttl: float) -> None:
+        with _connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO store (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl),
+            )
+            # Expired entries are dropped by the writers, there is no separate cleanup job
+            conn.execute("DELETE FROM store WHERE expires_at <= ?", (time.time(),))
+
+    def _acquire(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with _connect(self.path) as conn:
+            cursor = conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at"
+                " WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                (name, owner, now + ttl, now),
+            )
+            return cursor.rowcount > 0
+
+    async def get(self, key: str) -> Any:
+        """The stored value, or None if absent or expired."""
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a JSON-serializable value for `ttl` seconds."""
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def acquire(self, name: str, owner: str = WORKER_ID, ttl: float = 60.0) -> bool:
+        """Take or renew the lease `name` for `ttl` seconds. False while another owner holds it."""
+        return await asyncio.to_thread(self._acquire, name, owner, ttl)
+
+    @property
+    def limits_uri(self) -> str:
+        # See SQLiteLimitsStorage in src/utils/auth.py
+        return self.url
+
+
+class RedisStore:
+    """Key/value store in Redis (or anything speaking its protocol), shared by workers across machines."""
+
+    def __init__(self, url: str):
+        # Imported here, so memory:// and sqlite:// stores don't pay for the redis package
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise SystemExit(f"SHARED_STORE_URL={url} needs the redis package: pip install 'recruitee-mcp-server[redis]'")
+        self.url = url
+        self._client = aioredis.from_url(url)
+
+    async def get(self, key: str) -> Any:
+        """The stored value, or None if absent or expired."""
+        value = await self._client.get(key)
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a JSON-serializable value for `ttl` seconds."""
+        await self._client.set(key, json.dumps(value), px=int(ttl * 1000))
+
+    async def acquire(self, name: str, owner: str = WORKER_ID, ttl: float = 60.0) -> bool:
+        """Take or renew the lease `name` for `ttl` seconds. False while another owner holds it."""
+        key = f"lease:{name}"
+        if await self._client.set(key, owner, nx=True, px=int(ttl * 1000)):
+            return True
+        if (await self._client.get(key) or b"").decode() != owner:
+            return False
+        await self._client.pexpire(key, int(ttl * 1000))
+        return True
+
+    @property
+    def limits_uri(self) -> str:
+        # limits ships its own (synchronous) Redis storage
+        return self.url
+
+
+def create_store(url: str) -> SQLiteStore | RedisStore | None:
+    """Store for SHARED_STORE_URL. None for `memory://`: every process keeps its own state, as without workers."""
+    if url.startswith("sqlite://"):
+        return SQLiteStore(url)
+    if url.startswith(("redis://", "rediss://")):
+        return RedisStore(url)
+    if url.startswith("memory://"):
+        return None
+    raise SystemExit(f"Unsupported SHARED_STORE_URL {url}, expected memory://, sqlite://<path> or redis://<host>")
+
+
+shared_store = create_store(SHARED_STORE_URL)
+limits_storage_uri = shared_store.limits_uri if shared_store is not None else "memory://"
+
+
+async def acquire_lease(name: str, ttl: float) -> bool:
+    """
+    Whether this process should run the background job `name` for the next `ttl` seconds, so it runs
+    in one worker only. Always True without a shared store.
+    """
+    if shared_store is None:
+        return True
+    return await shared_store.acquire(name, WORKER_ID, ttl)
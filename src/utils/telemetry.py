@@ -0,0 +1,332 @@
+import asyncio
+import bisect
+import functools
+import inspect
+import itertools
+import os
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from fastmcp import FastMCP
+from fastmcp.tools.tool import FunctionTool
+
+
+
+# Latency buckets in seconds, and payload size buckets in bytes (256 B to 16 MB)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(9))
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: dict[tuple, Any] = {}
+        _metrics.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels[name] for name in self.label_names)
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for key, value in self._values.items():
+            yield self.name, _labels(self.label_names, key), value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        counts = self._values.get(key)
+        if counts is None:
+            # One count per bucket and +Inf, then the sum
+            counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for key, counts in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                yield f"{self.name}_bucket", _labels((*self.label_names, "le"), (*key, le)), cumulative
+            yield f"{self.name}_sum", _labels(self.label_names, key), counts[-1]
+            yield f"{self.name}_count", _labels(self.label_names, key), cumulative
+
+
+_metrics: list[_Metric] = []
+# Functions returning (name, type, help, [(labels, value), ...]) for counters kept elsewhere, e.g. cache stats
+_collectors: list[Callable[[], Iterable[tuple[str, str, str, list[tuple[dict, float]]]]]] = []
+
+
+def collector(fn: Callable[[], Iterable[tuple[str, str, str, list[tuple[dict, float]]]]]):
+    """Register `fn` to report metrics read at scrape time rather than recorded as they happen."""
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.type}"]
+        lines += [f"{name}{labels} {_number(value)}" for name, labels, value in metric.samples()]
+    for fn in _collectors:
+        for name, type_, help, samples in fn():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {type_}"]
+            lines += [f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}" for labels, value in samples]
+    return "\n".join(lines) + "\n"
+
+
+def endpoint(path: str) -> str:
+    """Recruitee path with ids folded, so every candidate or offer counts as one endpoint: /candidates/{id}/notes."""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+tool_calls = Counter("recruitee_mcp_tool_calls_total", "Tool calls by tool and outcome (ok, error).", ["tool", "outcome"])
+tool_duration = Histogram("recruitee_mcp_tool_duration_seconds", "Tool call latency.", ["tool"])
+tool_in_flight = Gauge("recruitee_mcp_tool_calls_in_flight", "Tool calls running.", ["tool"])
+tool_result_bytes = Histogram("recruitee_mcp_tool_result_bytes", "Size of tool results.", ["tool"], buckets=SIZE_BUCKETS)
+
+upstream_requests = Counter("recruitee_upstream_requests_total", "Recruitee API requests by endpoint and status code, retries included.", ["endpoint", "status"])
+upstream_duration = Histogram("recruitee_upstream_request_duration_seconds", "Recruitee API request latency, rate limit waits excluded.", ["endpoint"])
+upstream_in_flight = Gauge("recruitee_upstream_requests_in_flight", "Recruitee API requests waiting for a response.")
+upstream_response_bytes = Histogram("recruitee_upstream_response_bytes", "Size of Recruitee API responses.", ["endpoint"], buckets=SIZE_BUCKETS)
+
+event_loop_lag = Histogram("recruitee_mcp_event_loop_lag_seconds", "How late the event loop woke up a sleeping task, sampled 4 times a second.", buckets=LAG_BUCKETS)
+
+
+async def monitor_event_loop(interval: float = 0.25) -> None:
+    """Sample event loop lag forever. Code blocking the loop, e.g. a slow tool, delays every other request by as much."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(0.0, loop.time() - expected))
+
+
+@collector
+def _process_metrics():
+    # Linux only, like the servers we deploy to
+    try:
+        with open("/proc/self/statm") as f:
+            resident = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return []
+    return [("process_resident_memory_bytes", "gauge", "Resident memory size in bytes.", [({}, resident)])]
+
+
+@contextmanager
+def track_upstream(path: str) -> Iterator[dict]:
+    """Time one upstream HTTP request. The caller sets "status" and "bytes" in the yielded dict."""
+    request = {"status": "transport_error", "bytes": None}
+    started = time.perf_counter()
+    upstream_in_flight.inc()
+    try:
+        yield request
+    except asyncio.CancelledError:
+        request["status"] = "cancelled"
+        raise
+    finally:
+        upstream_in_flight.dec()
+        name = endpoint(path)
+        upstream_requests.inc(endpoint=name, status=request["status"])
+        upstream_duration.observe(time.perf_counter() - started, endpoint=name)
+        if request["bytes"] is not None:
+            upstream_response_bytes.observe(request["bytes"], endpoint=name)
+
+
+# Spans kept per tool call. A call over thousands of candidates makes a few spans per candidate, the
+# ones past this are only counted, per parent and name, so a trace stays small whatever the call did.
+_MAX_SPANS_PER_TRACE = 256
+
+
+class Span:
+    """A timed step of a tool call. Spans started while it is current become its children."""
+
+    __slots__ = ("name", "attributes", "start", "end", "children", "root", "folded", "kept")
+
+    def __init__(self, name: str, attributes: dict, root: Optional["Span"]):
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end: float | None = None
+        self.children: list[Span] = []
+        self.root = root or self
+        # Children over the trace's span budget: name -> [count, total seconds]
+        self.folded: dict[str, list] | None = None
+        # Spans kept in the trace, on its root
+        self.kept = 0
+
+    def fold(self, child: "Span") -> None:
+        if self.folded is None:
+            self.folded = {}
+        folded = self.folded.setdefault(child.name, [0, 0.0])
+        folded[0] += 1
+        folded[1] += child.end - child.start
+
+    def to_dict(self, origin: float) -> dict:
+        end = self.end if self.end is not None else time.perf_counter()
+        span = {"name": self.name, "start_ms": round((self.start - origin) * 1000, 3), "duration_ms": round((end - self.start) * 1000, 3)}
+        if self.attributes:
+            span["attributes"] = self.attributes
+        children = [child.to_dict(origin) for child in self.children]
+        if self.folded:
+            children += [{"name": name, "count": count, "total_ms": round(total * 1000, 3)} for name, (count, total) in self.folded.items()]
+        if children:
+            span["children"] = children
+        return span
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Record a step of the current tool call. Set more attributes on the yielded span as they are known.
+    Outside of a tool call, or once it has returned (e.g. a background refresh it started), nothing is kept.
+    Past `_MAX_SPANS_PER_TRACE` spans in the call, the span is only counted in its parent's summary.
+    """
+    parent = _current_span.get()
+    if parent is None or parent.root.end is not None:
+        yield Span(name, attributes, None)
+        return
+    root = parent.root
+    child = Span(name, attributes, root)
+    kept = root.kept < _MAX_SPANS_PER_TRACE
+    if kept:
+        root.kept += 1
+        parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.end = time.perf_counter()
+        _current_span.reset(token)
+        if not kept:
+            parent.fold(child)
+
+
+def _traced(fn: Callable) -> Callable:
+    """Tool function wrapped in a "run" span. Pydantic validates arguments against the wrapped signature."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def run(*args, **kwargs):
+            with span("run"):
+                return await fn(*args, **kwargs)
+    else:
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with span("run"):
+                return fn(*args, **kwargs)
+    return run
+
+
+class InstrumentedFastMCP(FastMCP):
+    """
+    FastMCP recording latency, outcome, concurrency and result size of every tool call, and keeping
+    the span trees of the latest `trace_buffer_size` calls (see `traces`).
+    """
+
+    def __init__(self, *args, trace_buffer_size: int = 200, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Newest last
+        self._traces: deque[dict] = deque(maxlen=trace_buffer_size)
+
+    def traces(self, tool: str | None = None, min_ms: float = 0.0, limit: int = 20) -> list[dict]:
+        """Latest span trees, newest first, optionally only of one tool or of calls that took at least `min_ms`."""
+        matches = (
+            trace for trace in reversed(self._traces)
+            if (tool is None or trace["attributes"]["tool"] == tool) and trace["duration_ms"] >= min_ms
+        )
+        return list(itertools.islice(matches, limit))
+
+    def _finish_trace(self, root: Span) -> None:
+        root.end = time.perf_counter()
+        # The tool function ran in the "run" span: before it arguments were validated, after it the result serialized
+        run = next((child for child in root.children if child.name == "run"), None)
+        if run is not None and run.end is not None:
+            validate = Span("validate", {}, root)
+            validate.start, validate.end = root.start, run.start
+            serialize = Span("serialize", {}, root)
+            serialize.start, serialize.end = run.end, root.end
+            root.children = [validate, *root.children, serialize]
+        self._traces.append({"started_at": round(time.time() - (root.end - root.start), 3), **root.to_dict(root.start)})
+
+    def add_tool(self, tool) -> None:
+        if isinstance(tool, FunctionTool):
+            tool.fn = _traced(tool.fn)
+        super().add_tool(tool)
+
+    async def _call_tool(self, key: str, arguments: dict[str, Any]) -> list:
+        # Tool names come from clients, unknown ones share a label
+        tool = key if self._tool_manager.has_tool(key) else "unknown"
+        started = time.perf_counter()
+        outcome = "error"
+        tool_in_flight.inc(tool=tool)
+        root = Span("tool", {"tool": tool}, None)
+        token = _current_span.set(root)
+        try:
+            result = await super()._call_tool(key, arguments)
+            outcome = "ok"
+            size = sum(len(getattr(content, "text", "").encode()) for content in result)
+            tool_result_bytes.observe(size, tool=tool)
+            root.attributes["result_bytes"] = size
+            return result
+        finally:
+            _current_span.reset(token)
+            root.attributes["outcome"] = outcome
+            self._finish_trace(root)
+            tool_in_flight.dec(tool=tool)
+            tool_calls.inc(tool=tool, outcome=outcome)
+            tool_duration.observe(time.perf_counter() - started, tool=tool)
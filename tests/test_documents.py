@@ -0,0 +1,19 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils import documents
+
+
+def test_concurrent_publish_of_the_same_document(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOCUMENTS_DIR", str(tmp_path))
+    content = b"<html><body>report</body></html>" * 1000
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        for _ in range(20):
+            filename = f"report_{os.urandom(8).hex()}.html"
+            # Every thread either writes it or finds it there, none fails
+            list(pool.map(lambda _: documents.write_document(filename, content), range(16)))
+            assert (tmp_path / filename).read_bytes() == content
+            assert (tmp_path / f"{filename}.gz").exists()
+
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
@@ -0,0 +1,98 @@
+import json
+from datetime import date
+
+import pytest
+from pydantic import BaseModel
+
+from src.utils import encoding
+
+
+RECORDS = [{"id": i, "name": f"Candidate {i}", "emails": [f"c{i}@example.com"]} for i in range(200)]
+
+
+class Offer(BaseModel):
+    id: int
+    title: str
+
+
+@pytest.mark.parametrize("position", [0, 1, 137, 10**9])
+def test_cursor_round_trip(position):
+    assert encoding.decode_cursor(encoding.encode_cursor(position)) == position
+
+
+def test_no_cursor_starts_at_the_beginning():
+    assert encoding.decode_cursor(None) == 0
+    assert encoding.decode_cursor("") == 0
+
+
+@pytest.mark.parametrize("cursor", ["garbage!", "e30=", encoding.encode_cursor(-1), "eyJwb3NpdGlvbiI6ICIzIn0="])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        encoding.decode_cursor(cursor)
+
+
+def test_columnar_lists_columns_in_order_of_first_appearance():
+    records = [{"id": 1, "name": "A"}, {"id": 2, "email": "b@example.com"}]
+    assert encoding.to_columnar(records) == {
+        "columns": ["id", "name", "email"],
+        "rows": [[1, "A", None], [2, None, "b@example.com"]],
+    }
+
+
+def test_shape_result_without_options_returns_the_records():
+    assert encoding.shape_result(RECORDS) is RECORDS
+
+
+def test_shape_result_columnar():
+    result = encoding.shape_result(RECORDS[:2], "columnar")
+    assert result == {
+        "columns": ["id", "name", "emails"],
+        "rows": [[0, "Candidate 0", ["c0@example.com"]], [1, "Candidate 1", ["c1@example.com"]]],
+        "next_cursor": None,
+    }
+
+
+@pytest.mark.parametrize("format", ["records", "columnar"])
+def test_max_bytes_truncates_and_the_cursor_continues(format):
+    max_bytes = 2000
+    pages = []
+    start = 0
+    while True:
+        result = encoding.shape_result(RECORDS[start:], format, max_bytes, start)
+        assert len(encoding.encode(result)) <= max_bytes
+        rows = result["items"] if format == "records" else result["rows"]
+        pages.append(rows)
+        if result["next_cursor"] is None:
+            break
+        start = encoding.decode_cursor(result["next_cursor"])
+
+    assert len(pages) > 1
+    ids = [row["id"] if format == "records" else row[0] for page in pages for row in page]
+    assert ids == [record["id"] for record in RECORDS]
+
+
+def test_max_bytes_returns_at_least_one_result():
+    result = encoding.shape_result(RECORDS, "records", max_bytes=10)
+    assert result["items"] == RECORDS[:1]
+    assert encoding.decode_cursor(result["next_cursor"]) == 1
+
+
+def test_has_more_keeps_a_cursor_when_everything_fits():
+    result = encoding.shape_result(RECORDS[:3], "records", max_bytes=10_000, start=5, has_more=True)
+    assert result["items"] == RECORDS[:3]
+    assert encoding.decode_cursor(result["next_cursor"]) == 8
+
+
+@pytest.mark.parametrize("orjson", [encoding.orjson, None], ids=["orjson", "pydantic_core"])
+def test_encode_is_compact_json_with_and_without_orjson(orjson, monkeypatch):
+    monkeypatch.setattr(encoding, "orjson", orjson)
+    data = {"offer": Offer(id=1, title="Dev"), "on": date(2025, 5, 20), "ids": [1, 2], "name": "Zoë"}
+
+    encoded = encoding.encode(data)
+    assert b" " not in encoded
+    assert json.loads(encoded) == {"offer": {"id": 1, "title": "Dev"}, "on": "2025-05-20", "ids": [1, 2], "name": "Zoë"}
+
+
+def test_encode_falls_back_for_integers_orjson_rejects():
+    big = 2**70
+    assert json.loads(encoding.encode({"id": big})) == {"id": big}
@@ -0,0 +1,37 @@
+import math
+
+import pytest
+
+from src.utils.stats import parse_number
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("5000", 5000),
+    ("12.5", 12.5),
+    ("1,5", 1.5),
+    ("5 000 PLN", 5000),
+    ("5 000 zł", 5000),
+    ("5.000 PLN", 5000),
+    ("1.200.000", 1_200_000),
+    ("1,200,000.50", 1_200_000.5),
+    ("5.000,50 zł", 5000.5),
+    ("€ 4000", 4000),
+    ("10k", 10_000),
+    ("10K", 10_000),
+    ("1.5k", 1500),
+    ("12,5k", 12_500),
+    ("4000-6000", 5000),
+    ("4000 - 6000", 5000),
+    ("4000 to 6000", 5000),
+    ("10 000 - 12 000 PLN", 11_000),
+    ("10-15k", 12_500),
+    ("10k-15k", 12_500),
+    ("9000-15k", 12_000),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "negotiable", "-", "k"])
+def test_parse_number_without_a_number(text):
+    assert math.isnan(parse_number(text))
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from src.tools import utils
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """
+    Route `_get` through a mock transport: set `upstream.handler` to answer requests, `upstream.bucket`
+    to change the rate limit. Requests seen are in `upstream.requests`.
+    """
+
+    class Upstream:
+        requests: list[httpx.Request] = []
+        handler = staticmethod(lambda request: httpx.Response(200, json={"path": request.url.path}))
+        bucket = utils._TokenBucket(1000.0, 1000)
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        Upstream.requests.append(request)
+        return Upstream.handler(request)
+
+    monkeypatch.setattr(utils, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handle)))
+    monkeypatch.setattr(utils, "_bucket", lambda company_id: Upstream.bucket)
+    monkeypatch.setattr(utils, "_inflight", {})
+    return Upstream
+
+
+def test_token_bucket_allows_a_burst_then_the_rate():
+    async def main():
+        bucket = utils._TokenBucket(rate=50.0, burst=5)
+        started = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire(utils.PRIORITY_INTERACTIVE)
+        burst = time.monotonic() - started
+        for _ in range(5):
+            await bucket.acquire(utils.PRIORITY_INTERACTIVE)
+        return burst, time.monotonic() - started
+
+    burst, total = asyncio.run(main())
+    assert burst < 0.02
+    # 5 more tokens at 50 per second
+    assert 0.08 <= total < 0.3
+
+
+def test_token_bucket_serves_interactive_callers_first():
+    async def main():
+        bucket = utils._TokenBucket(rate=100.0, burst=1)
+        await bucket.acquire(utils.PRIORITY_INTERACTIVE)
+        order = []
+
+        async def caller(name, priority):
+            await bucket.acquire(priority)
+            order.append(name)
+
+        bulk = [asyncio.create_task(caller(f"bulk{i}", utils.PRIORITY_BULK)) for i in range(3)]
+        await asyncio.sleep(0)
+        await asyncio.gather(caller("interactive", utils.PRIORITY_INTERACTIVE), *bulk)
+        return order
+
+    assert asyncio.run(main()) == ["interactive", "bulk0", "bulk1", "bulk2"]
+
+
+def test_token_bucket_pause_holds_every_caller():
+    async def main():
+        bucket = utils._TokenBucket(rate=1000.0, burst=10)
+        bucket.pause(0.1)
+        started = time.monotonic()
+        await bucket.acquire(utils.PRIORITY_INTERACTIVE)
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) >= 0.09
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2", 2.0),
+    ("0.5", 0.5),
+    ("-3", 0.0),
+    ("3600", utils._RETRY_AFTER_MAX),
+    ("soon", None),
+    ("", None),
+])
+def test_retry_after_seconds(value, expected):
+    headers = {"retry-after": value} if value else {}
+    assert utils._retry_after(httpx.Response(429, headers=headers)) == expected
+
+
+def test_retry_after_http_date():
+    date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 28 <= utils._retry_after(httpx.Response(429, headers={"retry-after": date})) <= 30
+
+
+def test_429_waits_for_retry_after_and_pauses_the_bucket(upstream):
+    statuses = iter([429, 200])
+    upstream.handler = lambda request: httpx.Response(next(statuses), headers={"retry-after": "0.2"}, json={"ok": True})
+
+    async def main():
+        started = time.monotonic()
+        result = await utils._get("/offers")
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(main())
+    assert result == {"ok": True}
+    assert len(upstream.requests) == 2
+    assert elapsed >= 0.2
+    # Other callers are held back by the same pause
+    assert upstream.bucket.updated > time.monotonic() - 0.1
+
+
+def test_identical_concurrent_gets_share_one_request(upstream):
+    async def main():
+        same = [utils._get("/offers", {"scope": "active", "limit": 10}) for _ in range(5)]
+        reordered = utils._get("/offers", {"limit": 10, "scope": "active"})
+        other = utils._get("/offers", {"scope": "archived"})
+        return await asyncio.gather(*same, reordered, other)
+
+    results = asyncio.run(main())
+    assert len(upstream.requests) == 2
+    assert all(result is results[0] for result in results[:6])
+    assert not utils._inflight
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_request(upstream):
+    async def main():
+        first = asyncio.create_task(utils._get("/offers"))
+        second = asyncio.create_task(utils._get("/offers"))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main())["path"].endswith("/offers")
+    assert len(upstream.requests) == 1
+
+
+def test_shared_request_runs_at_the_best_priority_of_its_callers(upstream):
+    upstream.bucket = utils._TokenBucket(rate=50.0, burst=1)
+
+    async def main():
+        await upstream.bucket.acquire(utils.PRIORITY_INTERACTIVE)
+        with utils.upstream_priority(utils.PRIORITY_BULK):
+            # Started by bulk work and queued behind other bulk work...
+            others = [asyncio.create_task(utils._get(f"/offers/{i}")) for i in range(2, 5)]
+            await asyncio.sleep(0)
+            shared = asyncio.create_task(utils._get("/offers/1"))
+            await asyncio.sleep(0)
+        # ...then an interactive call joins it
+        await utils._get("/offers/1")
+        await asyncio.gather(shared, *others)
+
+    asyncio.run(main())
+    paths = [request.url.path.rsplit("/", 1)[-1] for request in upstream.requests]
+    assert paths == ["1", "2", "3", "4"]
+    assert len(upstream.requests) == 4